@@ -0,0 +1,322 @@
+"""
+Benchmark the p15-p17 custom ops on the CPU over a sweep of sizes.
+
+Each case runs one op (`conv1d_batched`, `softmax_batched` or
+`attention_flash`) through MAX and times its phases separately: compiling
+the graph, uploading the inputs, executing and downloading the result.
+Every phase is warmed up and then timed `--repeats` times; the median, p95
+and, from the median, throughput in elements/s and GB/s are printed and
+saved as JSON so runs can be compared.
+
+On the CPU, uploading wraps the NumPy buffers and downloading returns the
+result tensor itself, so neither copies any data. Their timings are the
+per-call overhead of the driver; their bytes and GB/s are reported as null.
+Usage:
+
+    python benchmarks/custom_ops_cpu.py [--ops conv_1d softmax attention]
+        [--repeats N] [--warmup N] [--output results.json]
+"""
+
+import argparse
+import contextlib
+import importlib.metadata
+import io
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from max.driver import CPU, Device, Tensor
+from max.dtype import DType
+from max.engine import InferenceSession
+from max.graph import Graph
+from numpy.typing import NDArray
+from scipy.special import softmax as scipy_softmax
+
+SOLUTIONS = Path(__file__).resolve().parent.parent / "solutions"
+sys.path.insert(0, str(SOLUTIONS))
+from common.op_package import ensure_op_package  # noqa: E402
+from p15.p15 import (  # noqa: E402
+    build_conv_1d_batched_graph,
+    reference_conv_1d,
+)
+from p16.p16 import build_softmax_variant_graph  # noqa: E402
+from p17.p17 import (  # noqa: E402
+    build_attention_batched_graph,
+    reference_attention,
+)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DTYPE = DType.float32
+CONV_SIZE = 15
+
+# Signal lengths
+CONV_SIZES = [1 << 10, 1 << 14, 1 << 18, 1 << 22]
+# (batch, row_size)
+SOFTMAX_SIZES = [(1, 1 << 16), (1, 1 << 20), (1024, 128), (4096, 1024)]
+# (num_queries, seq_len, d)
+ATTENTION_SIZES = [
+    (1, 1024, 64),
+    (16, 4096, 64),
+    (256, 1024, 64),
+    (64, 16384, 32),
+]
+
+
+@dataclass
+class Case:
+    """One op at one size, with what it reads and writes per execution."""
+
+    op: str
+    size: dict
+    build_graph: Callable[[], Graph]
+    inputs: list[NDArray[np.float32]]
+    reference: Callable[[], NDArray[np.float32]]
+    # Elements produced or, for attention, query-key scores computed
+    elements: int
+
+    @property
+    def upload_bytes(self) -> int:
+        return sum(array.nbytes for array in self.inputs)
+
+
+def conv_1d_cases(device: Device) -> list[Case]:
+    mojo_kernels = ensure_op_package(SOLUTIONS / "p15" / "op")
+    cases = []
+    for size in CONV_SIZES:
+        signal = np.random.randn(1, size).astype(np.float32)
+        kernel = np.random.randn(1, CONV_SIZE).astype(np.float32)
+        cases.append(
+            Case(
+                "conv_1d",
+                {"input_size": size, "conv_size": CONV_SIZE},
+                lambda size=size: build_conv_1d_batched_graph(
+                    (1, size), (1, CONV_SIZE), DTYPE, device, mojo_kernels
+                ),
+                [signal, kernel],
+                lambda signal=signal, kernel=kernel: reference_conv_1d(
+                    signal, kernel
+                ),
+                size,
+            )
+        )
+    return cases
+
+
+def softmax_cases(device: Device) -> list[Case]:
+    mojo_kernels = ensure_op_package(SOLUTIONS / "p16" / "op")
+    cases = []
+    for batch, row_size in SOFTMAX_SIZES:
+        x = np.random.randn(batch, row_size).astype(np.float32)
+        parameters = {"batch_size": batch, "row_size": row_size}
+        cases.append(
+            Case(
+                "softmax",
+                {"batch": batch, "row_size": row_size},
+                lambda x=x, parameters=parameters: build_softmax_variant_graph(
+                    "softmax_batched",
+                    x.shape,
+                    parameters,
+                    DTYPE,
+                    device,
+                    mojo_kernels,
+                ),
+                [x],
+                lambda x=x: scipy_softmax(x, axis=-1),
+                x.size,
+            )
+        )
+    return cases
+
+
+def attention_cases(device: Device) -> list[Case]:
+    mojo_kernels = ensure_op_package(SOLUTIONS / "p17" / "op")
+    cases = []
+    for num_queries, seq_len, d in ATTENTION_SIZES:
+        q = np.random.randn(num_queries, d).astype(np.float32) * 0.1
+        k = np.random.randn(seq_len, d).astype(np.float32) * 0.1
+        v = np.random.randn(seq_len, d).astype(np.float32) * 0.1
+        cases.append(
+            Case(
+                "attention",
+                {"num_queries": num_queries, "seq_len": seq_len, "d": d},
+                lambda q=q, k=k, v=v: build_attention_batched_graph(
+                    "attention_flash",
+                    q.shape,
+                    k.shape,
+                    v.shape,
+                    DTYPE,
+                    device,
+                    mojo_kernels,
+                ),
+                [q, k, v],
+                lambda q=q, k=k, v=v: reference_attention(q, k, v),
+                num_queries * seq_len,
+            )
+        )
+    return cases
+
+
+CASES = {
+    "conv_1d": conv_1d_cases,
+    "softmax": softmax_cases,
+    "attention": attention_cases,
+}
+
+
+def summarize(timings: list[float]) -> dict:
+    return {
+        "median_s": float(np.median(timings)),
+        "p95_s": float(np.percentile(timings, 95)),
+        "min_s": float(np.min(timings)),
+    }
+
+
+def time_phase(fn: Callable[[], object], warmup: int, repeats: int) -> dict:
+    """Timings of `fn()` over `repeats` calls after `warmup` untimed ones."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def run_case(case: Case, device: Device, warmup: int, repeats: int) -> dict:
+    # A fresh session so the compile is not served from an earlier case
+    session = InferenceSession(devices=[device])
+    start = time.perf_counter()
+    model = session.load(case.build_graph())
+    compile_s = time.perf_counter() - start
+
+    def upload() -> list[Tensor]:
+        return [Tensor.from_numpy(array).to(device) for array in case.inputs]
+
+    tensors = upload()
+
+    def execute() -> Tensor:
+        return model.execute(*tensors)[0]
+
+    result = execute()
+
+    def download() -> NDArray[np.float32]:
+        return result.to(CPU()).to_numpy()
+
+    output = download()
+    expected = case.reference()
+    np.testing.assert_allclose(
+        output.reshape(expected.shape), expected, rtol=1e-4, atol=1e-4
+    )
+
+    phases = {
+        "upload": time_phase(upload, warmup, repeats),
+        "execute": time_phase(execute, warmup, repeats),
+        "download": time_phase(download, warmup, repeats),
+    }
+    # Executing reads the inputs and writes the output once
+    download_bytes = output.nbytes
+    execute_bytes = case.upload_bytes + download_bytes
+    # Host memory is the device memory: the transfers do not copy
+    copies = device != CPU()
+    for phase, nbytes in (
+        ("upload", case.upload_bytes if copies else None),
+        ("execute", execute_bytes),
+        ("download", download_bytes if copies else None),
+    ):
+        phases[phase]["bytes"] = nbytes
+        phases[phase]["gb_per_s"] = (
+            None if nbytes is None else nbytes / phases[phase]["median_s"] / 1e9
+        )
+    phases["execute"]["elements_per_s"] = (
+        case.elements / phases["execute"]["median_s"]
+    )
+    return {
+        "op": case.op,
+        "size": case.size,
+        "elements": case.elements,
+        "compile_s": compile_s,
+        "phases": phases,
+    }
+
+
+def environment(device: Device, args: argparse.Namespace) -> dict:
+    try:
+        max_version = importlib.metadata.version("max")
+    except importlib.metadata.PackageNotFoundError:
+        max_version = "unknown"
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "device": str(device),
+        "dtype": str(DTYPE),
+        "max": max_version,
+        "numpy": np.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "warmup": args.warmup,
+        "repeats": args.repeats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--ops", nargs="+", choices=list(CASES), default=list(CASES)
+    )
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="JSON file to write (default: a timestamped file in "
+        "benchmarks/results)",
+    )
+    args = parser.parse_args()
+    if args.repeats < 1:
+        parser.error(f"--repeats must be at least 1, got {args.repeats}")
+
+    np.random.seed(0)
+    device = CPU()
+    report = {"environment": environment(device, args), "results": []}
+
+    print(
+        f"{'op':>9} {'size':>24} {'compile (s)':>11} {'upload (ms)':>11} "
+        f"{'execute (ms)':>12} {'p95 (ms)':>9} {'download (ms)':>13} "
+        f"{'Melem/s':>9} {'GB/s':>7}"
+    )
+    for op in args.ops:
+        for case in CASES[op](device):
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run_case(case, device, args.warmup, args.repeats)
+            report["results"].append(result)
+            phases = result["phases"]
+            size = "x".join(str(value) for value in case.size.values())
+            print(
+                f"{op:>9} {size:>24} {result['compile_s']:>11.2f} "
+                f"{phases['upload']['median_s'] * 1e3:>11.3f} "
+                f"{phases['execute']['median_s'] * 1e3:>12.3f} "
+                f"{phases['execute']['p95_s'] * 1e3:>9.3f} "
+                f"{phases['download']['median_s'] * 1e3:>13.3f} "
+                f"{phases['execute']['elements_per_s'] / 1e6:>9.1f} "
+                f"{phases['execute']['gb_per_s']:>7.2f}"
+            )
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"custom_ops_cpu-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare the CPU softmax ops from p16 with `scipy.special.softmax`.
+
+Runs the vectorized, row-parallel Mojo CPU kernels through MAX on the same
+inputs as SciPy and reports the median time of each. Usage:
+
+    python benchmarks/softmax_cpu.py [--repeats N]
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from max.driver import CPU
+from max.engine import InferenceSession
+from scipy.special import softmax as scipy_softmax
+
+SOLUTIONS = Path(__file__).resolve().parent.parent / "solutions"
+sys.path.insert(0, str(SOLUTIONS / "p16"))
+from p16 import softmax, softmax_batched  # noqa: E402
+
+# (batch, row_size); a batch of 1 goes through the 1D softmax op
+SIZES = [
+    (1, 128),
+    (1, 1 << 16),
+    (1, 1 << 20),
+    (1024, 128),
+    (4096, 1024),
+    (65536, 256),
+]
+
+
+def time_call(fn, repeats: int) -> float:
+    """Median wall time of `fn()` after one untimed warmup call."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    device = CPU()
+    session = InferenceSession(devices=[device])
+
+    print(
+        f"{'batch':>7} {'row_size':>9} {'mojo (ms)':>10} "
+        f"{'scipy (ms)':>11} {'speedup':>8}"
+    )
+    for batch, row_size in SIZES:
+        x = np.random.randn(batch, row_size).astype(np.float32)
+
+        def mojo_fn(x=x) -> np.ndarray:
+            if x.shape[0] == 1:
+                return softmax(x[0], session, device).to_numpy()
+            return softmax_batched(x, session, device).to_numpy()
+
+        def scipy_fn(x=x) -> np.ndarray:
+            return scipy_softmax(x, axis=-1)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            np.testing.assert_allclose(
+                mojo_fn().reshape(x.shape), scipy_fn(), rtol=1e-4, atol=1e-7
+            )
+        mojo_time = time_call(mojo_fn, args.repeats)
+        scipy_time = time_call(scipy_fn, args.repeats)
+        print(
+            f"{batch:>7} {row_size:>9} {mojo_time * 1e3:>10.3f} "
+            f"{scipy_time * 1e3:>11.3f} {scipy_time / mojo_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Host-side helpers shared by the custom-op puzzle drivers."""
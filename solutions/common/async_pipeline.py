@@ -0,0 +1,109 @@
+"""
+Asynchronous execution of the custom-op host drivers (p15-p17).
+
+`model.execute` blocks, and a synchronous call uploads its inputs, executes
+and downloads the result one after the other. A `DevicePipeline` runs each
+of those stages on its own worker thread, so while one request executes the
+next one is already uploading and the previous one downloading. The
+`*_async` entry points (e.g. `conv_1d_async()`) submit a request to a
+pipeline and can be awaited from asyncio:
+
+    async with DevicePipeline(device, max_in_flight=4) as pipeline:
+        results = await asyncio.gather(
+            *(conv_1d_async(x, kernel, session, pipeline) for x in signals)
+        )
+
+At most `max_in_flight` requests hold device memory at once; further ones
+wait for a slot. On the CPU there is nothing to copy, so requests run whole
+on a pool of worker threads instead and overlap with each other.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from max.driver import CPU, Device, Tensor
+from max.dtype import DType
+
+from .transfers import ArrayOrTensor, to_device, to_host
+
+
+class DevicePipeline:
+    """Bounded upload / execute / download pipeline for one device.
+
+    Each stage has a single worker, so the stages of consecutive requests
+    overlap but every stage keeps the order requests reached it in. Use it
+    as an (async) context manager, or call `close()`, to stop the workers.
+    """
+
+    def __init__(
+        self,
+        device: Device,
+        max_in_flight: int = 4,
+        cpu_workers: Optional[int] = None,
+    ):
+        if max_in_flight < 1:
+            raise ValueError(
+                f"max_in_flight must be at least 1, got {max_in_flight}"
+            )
+        self.device = device
+        self.max_in_flight = max_in_flight
+        self._slots = asyncio.Semaphore(max_in_flight)
+        if device == CPU():
+            workers = cpu_workers or min(max_in_flight, os.cpu_count() or 1)
+            self._workers = ThreadPoolExecutor(
+                workers, thread_name_prefix="cpu-execute"
+            )
+            self._stages = None
+        else:
+            self._workers = None
+            self._stages = tuple(
+                ThreadPoolExecutor(1, thread_name_prefix=name)
+                for name in ("upload", "execute", "download")
+            )
+
+    async def run(
+        self,
+        compute: Callable[..., Tensor],
+        inputs: list[ArrayOrTensor],
+        dtype: DType,
+    ) -> Tensor:
+        """`compute(*inputs)` on the device, with the result on the host.
+
+        `compute` receives the inputs as `dtype` Tensors on the device and
+        must return its result on the device.
+        """
+        loop = asyncio.get_running_loop()
+
+        def upload() -> list[Tensor]:
+            return [to_device(value, dtype, self.device) for value in inputs]
+
+        async with self._slots:
+            if self._stages is None:
+                return await loop.run_in_executor(
+                    self._workers, lambda: to_host(compute(*upload()))
+                )
+            upload_stage, execute_stage, download_stage = self._stages
+            tensors = await loop.run_in_executor(upload_stage, upload)
+            result = await loop.run_in_executor(
+                execute_stage, lambda: compute(*tensors)
+            )
+            return await loop.run_in_executor(download_stage, to_host, result)
+
+    def close(self) -> None:
+        """Wait for submitted work and stop the worker threads."""
+        for executor in self._stages or (self._workers,):
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> "DevicePipeline":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "DevicePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,79 @@
+"""
+Element types supported by the custom-op host drivers (p15-p17).
+
+The ops are bandwidth-bound, so moving float16 or bfloat16 data halves the
+traffic; reductions inside the kernels still accumulate in float32. NumPy has
+no bfloat16, so bfloat16 data crosses the host boundary as its raw 16 bits in
+a uint16 array and is reinterpreted with `Tensor.view`.
+"""
+
+import numpy as np
+from max.driver import Tensor
+from max.dtype import DType
+from numpy.typing import NDArray
+
+SUPPORTED_DTYPES = (DType.float32, DType.float16, DType.bfloat16)
+
+# (rtol, atol) for comparing a result against a float32 reference computed
+# from the same, already rounded, inputs
+TOLERANCES = {
+    DType.float32: (1e-4, 1e-6),
+    DType.float16: (2e-3, 1e-5),
+    DType.bfloat16: (2e-2, 1e-4),
+}
+
+# Most negative finite value of each dtype, e.g. to pad softmax rows
+LOWEST = {
+    DType.float32: float(np.finfo(np.float32).min),
+    DType.float16: float(np.finfo(np.float16).min),
+    DType.bfloat16: -3.3895313892515355e38,
+}
+
+
+def check_dtype(dtype: DType) -> None:
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(
+            f"unsupported dtype {dtype}, expected one of {SUPPORTED_DTYPES}"
+        )
+
+
+def _bfloat16_bits(array: NDArray) -> NDArray[np.uint16]:
+    """Round float32 values to the nearest bfloat16, ties to even."""
+    bits = np.ascontiguousarray(array, dtype=np.float32).view(np.uint32)
+    bits = bits.astype(np.uint64)
+    rounded = (bits + 0x7FFF + ((bits >> 16) & 1)) >> 16
+    return rounded.astype(np.uint16)
+
+
+def _bfloat16_to_float32(bits: NDArray[np.uint16]) -> NDArray[np.float32]:
+    return (bits.astype(np.uint32) << 16).view(np.float32)
+
+
+def round_to_dtype(array: NDArray, dtype: DType) -> NDArray[np.float32]:
+    """`array` as float32 holding only values representable in `dtype`.
+
+    Use it to build references that see exactly what the kernels see.
+    """
+    check_dtype(dtype)
+    if dtype == DType.float16:
+        return np.asarray(array, dtype=np.float16).astype(np.float32)
+    if dtype == DType.bfloat16:
+        return _bfloat16_to_float32(_bfloat16_bits(array))
+    return np.asarray(array, dtype=np.float32)
+
+
+def to_tensor(array: NDArray, dtype: DType) -> Tensor:
+    """Host tensor of `dtype` holding `array`, rounded to nearest."""
+    check_dtype(dtype)
+    if dtype == DType.float16:
+        return Tensor.from_numpy(np.ascontiguousarray(array, dtype=np.float16))
+    if dtype == DType.bfloat16:
+        return Tensor.from_numpy(_bfloat16_bits(array)).view(DType.bfloat16)
+    return Tensor.from_numpy(np.ascontiguousarray(array, dtype=np.float32))
+
+
+def to_numpy(tensor: Tensor) -> NDArray[np.float32]:
+    """Contents of a host tensor of any supported dtype as float32."""
+    if tensor.dtype == DType.bfloat16:
+        return _bfloat16_to_float32(tensor.view(DType.uint16).to_numpy())
+    return tensor.to_numpy().astype(np.float32, copy=False)
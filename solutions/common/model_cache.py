@@ -0,0 +1,277 @@
+"""
+Caching of compiled MAX models for the custom-op host drivers (p15-p17).
+
+Building a `Graph` is cheap, but `InferenceSession.load` compiles it together
+with the Mojo kernels in the `op/` package, and that dominates the cost of a
+single call. The drivers look compiled models up by a key describing
+everything that affects compilation (shapes, dtype, device and a content hash
+of the `op/` sources), so editing a kernel never serves a stale model.
+
+`ModelCache` keeps models in memory for the lifetime of a process. Backing it
+with a `DiskModelCache` also persists compiled models, so short-lived
+processes skip compilation when another process already paid for it.
+Set `PUZZLES_MODEL_CACHE_DIR` to move the on-disk cache and
+`PUZZLES_MODEL_CACHE=0` to disable it.
+
+Serializing a compiled model relies on `Model._export_mef`, which is not
+part of the stable MAX API. When the installed `max` does not have it the
+on-disk cache is disabled, with a single log message saying so.
+"""
+
+import hashlib
+import importlib.metadata
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Hashable, Optional
+
+from max.driver import Device
+from max.engine import InferenceSession, Model
+from max.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+
+def device_key(device: Device) -> tuple[str, int]:
+    """Hashable identity of a device for use in cache keys."""
+    return (device.label, device.id)
+
+
+def max_version() -> str:
+    """Installed `max` version; compiled models are not portable across it."""
+    try:
+        return importlib.metadata.version("max")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class DiskModelCache:
+    """Compiled models persisted on disk and shared between processes.
+
+    Each entry is a single file named after a hash of the graph signature and
+    the `max` version. Writes go to a temporary file that is atomically
+    renamed into place, so concurrent workers never observe a partial entry.
+    When the directory grows past `max_bytes` the least recently used entries
+    are removed; hits refresh an entry's mtime to mark it as used. The
+    directory is created by the first `store()`.
+    """
+
+    SUFFIX = ".mef"
+    # Temporary files older than this are left over from crashed writers
+    STALE_TMP_SECONDS = 3600
+    # Whether the missing-export warning was logged in this process
+    _warned = False
+
+    def __init__(self, directory: Path, max_bytes: int = 2 * 1024**3):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def supported() -> bool:
+        """Whether the installed `max` can serialize compiled models."""
+        if hasattr(Model, "_export_mef"):
+            return True
+        if not DiskModelCache._warned:
+            DiskModelCache._warned = True
+            logger.warning(
+                "max %s cannot export compiled models; the on-disk model "
+                "cache is disabled",
+                max_version(),
+            )
+        return False
+
+    @classmethod
+    def from_env(cls) -> Optional["DiskModelCache"]:
+        """Cache configured by the environment, or None if disabled."""
+        if os.environ.get("PUZZLES_MODEL_CACHE", "1") == "0":
+            return None
+        if not cls.supported():
+            return None
+        directory = os.environ.get("PUZZLES_MODEL_CACHE_DIR")
+        if directory is None:
+            directory = Path.home() / ".cache" / "mojo-gpu-puzzles" / "models"
+        return cls(Path(directory))
+
+    def path_for(self, key: Hashable) -> Path:
+        digest = hashlib.sha256(repr((key, max_version())).encode()).hexdigest()
+        return self.directory / (digest + self.SUFFIX)
+
+    def load(
+        self,
+        key: Hashable,
+        session: InferenceSession,
+        custom_extensions: list[Path],
+    ) -> Optional[Model]:
+        """Load the model stored for `key`, or return None on a miss."""
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+        try:
+            model = session.load(path, custom_extensions=custom_extensions)
+        except Exception:
+            # Pruned by another worker or unreadable; recompile instead
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return model
+
+    def store(self, key: Hashable, model: Model) -> None:
+        """Persist `model` for `key` and prune the cache to its size cap."""
+        if not self.supported():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            model._export_mef(tmp_name)
+            os.replace(tmp_name, self.path_for(key))
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        self.prune()
+
+    def prune(self) -> None:
+        """Remove least recently used entries until under `max_bytes`."""
+        if not self.directory.is_dir():
+            return
+        entries = []
+        now = time.time()
+        for path in self.directory.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == ".tmp":
+                if now - stat.st_mtime > self.STALE_TMP_SECONDS:
+                    path.unlink(missing_ok=True)
+            elif path.suffix == self.SUFFIX:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every entry from the directory."""
+        for path in self.directory.glob("*" + self.SUFFIX):
+            path.unlink(missing_ok=True)
+
+
+class ModelCache:
+    """LRU cache of compiled models keyed by graph signature.
+
+    Models are bound to the session that compiled them, so the session is
+    part of the key and is kept alive by its entries. Call `clear()` to drop
+    every entry, e.g. after changing kernels in a long-running process.
+    Misses are looked up in `disk_cache` before compiling, and compiled
+    models are stored there if possible; a failed store is only logged.
+    Concurrent misses on the same key compile once; the other callers wait
+    for that model.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        disk_cache: Optional[DiskModelCache] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[InferenceSession, Model]] = (
+            OrderedDict()
+        )
+        # Compilations in progress, so concurrent misses wait on one another
+        self._loading: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        session: InferenceSession,
+        build_graph: Callable[[], Graph],
+        custom_extensions: Optional[list[Path]] = None,
+    ) -> Model:
+        """Return the model for `key`, compiling `build_graph()` on a miss.
+
+        `key` must be stable across processes when a disk cache is used, and
+        `custom_extensions` are the `op/` packages the graph was built with.
+        """
+        full_key = (id(session), key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return entry[1]
+            loading = self._loading.get(full_key)
+            if loading is None:
+                self.misses += 1
+                loading = self._loading[full_key] = Future()
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+        if not owner:
+            return loading.result()
+
+        # Compile outside the lock so lookups for other keys are not blocked
+        compiled = False
+        try:
+            model = None
+            if self.disk_cache is not None:
+                model = self.disk_cache.load(
+                    key, session, custom_extensions or []
+                )
+            if model is None:
+                model = session.load(build_graph())
+                compiled = True
+        except BaseException as error:
+            # Waiters see the error; the next call for the key retries
+            with self._lock:
+                del self._loading[full_key]
+            loading.set_exception(error)
+            raise
+
+        with self._lock:
+            del self._loading[full_key]
+            self._entries[full_key] = (session, model)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        loading.set_result(model)
+
+        if compiled and self.disk_cache is not None:
+            # Best effort: a full or read-only cache directory must not fail
+            # a call whose model compiled fine
+            try:
+                self.disk_cache.store(key, model)
+            except Exception as error:
+                logger.warning(
+                    "could not store a compiled model in %s: %s",
+                    self.disk_cache.directory,
+                    error,
+                )
+        return model
+
+    def clear(self) -> None:
+        """Drop all cached models and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,133 @@
+"""
+Incremental builds of the custom-op packages (`op/`) of p15-p17.
+
+`mojo package op -o op.mojopkg` recompiles every source each time it runs.
+`ensure_op_package()` stores the content hash of the sources next to the
+package, in `op.mojopkg.sha256`, and only repackages when it changes. The
+drivers call it before building a graph and load the package it returns;
+the pixi and poe tasks call it through this script:
+
+    python solutions/common/op_package.py problems/p15/op
+
+This module only depends on the standard library so that it runs as a
+script before anything else is importable.
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+
+PACKAGE_SUFFIX = ".mojopkg"
+HASH_SUFFIX = ".sha256"
+
+_op_hashes: dict[Path, tuple[tuple, str]] = {}
+
+
+def hash_file(package: Path) -> Path:
+    """Where the source hash of `package` is stored."""
+    return package.with_name(package.name + HASH_SUFFIX)
+
+
+def hash_op_package(op_dir: Path) -> str:
+    """Content hash of every `.mojo` source in a custom-op package.
+
+    The hash is memoized on the sources' (mtime, size) so calling this once
+    per request does not re-read the package. A built `.mojopkg` hashes to
+    the hash of the sources it was built from, when that was recorded.
+    """
+    op_dir = Path(op_dir).resolve()
+    if op_dir.suffix == PACKAGE_SUFFIX:
+        stored = hash_file(op_dir)
+        if stored.exists():
+            return stored.read_text().strip()
+        return hashlib.sha256(op_dir.read_bytes()).hexdigest()
+
+    sources = sorted(op_dir.rglob("*.mojo"))
+    signature = tuple(
+        (str(path), path.stat().st_mtime_ns, path.stat().st_size)
+        for path in sources
+    )
+    cached = _op_hashes.get(op_dir)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    for path in sources:
+        digest.update(path.relative_to(op_dir).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    op_hash = digest.hexdigest()
+    _op_hashes[op_dir] = (signature, op_hash)
+    return op_hash
+
+
+def _write_atomically(path: Path, write: Callable[[str], object]) -> None:
+    """Call `write` on a temporary file and rename it to `path`."""
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=path.suffix
+    )
+    os.close(fd)
+    try:
+        write(tmp_name)
+        os.replace(tmp_name, path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+
+
+def ensure_op_package(op_dir: Path, package: Optional[Path] = None) -> Path:
+    """`op_dir` packaged as `package`, repackaged only if its sources changed.
+
+    `package` defaults to `op.mojopkg` next to `op_dir`. Returns the package,
+    or `op_dir` itself when the `mojo` CLI is not installed, in which case
+    MAX compiles the sources directly as before.
+    """
+    op_dir = Path(op_dir).resolve()
+    package = Path(package) if package else op_dir.with_suffix(PACKAGE_SUFFIX)
+    source_hash = hash_op_package(op_dir)
+    stored = hash_file(package)
+    if (
+        package.exists()
+        and stored.exists()
+        and stored.read_text().strip() == source_hash
+    ):
+        return package
+    mojo = shutil.which("mojo")
+    if mojo is None:
+        return op_dir
+
+    # Both files are renamed into place, so concurrent drivers never load a
+    # partial package. The hash is written last: a reader that sees it also
+    # sees the package it describes.
+    _write_atomically(
+        package,
+        lambda tmp_name: subprocess.run(
+            [mojo, "package", str(op_dir), "-o", tmp_name], check=True
+        ),
+    )
+    _write_atomically(
+        stored, lambda tmp_name: Path(tmp_name).write_text(source_hash + "\n")
+    )
+    return package
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("op_dir", type=Path, help="custom-op package sources")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="package to build (default: op.mojopkg next to op_dir)",
+    )
+    args = parser.parse_args()
+    print(ensure_op_package(args.op_dir, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Shape bucketing for the custom-op host drivers (p15-p17).
+
+The ops specialize on their sizes: layouts, grids and loop bounds are
+compile-time parameters, so every new batch or sequence length is a new
+compiled model. A bucket policy rounds such a size up to one of a bounded set
+of sizes. The drivers pad their inputs to the bucket in a way that leaves the
+result unchanged (zeros past the end of a convolution, the lowest finite
+value in softmax rows, real lengths passed as offsets to attention) and slice
+the padding off the output, so one compiled model serves a whole bucket.
+
+Any callable mapping a size to a size at least as large is a policy:
+
+    softmax_batched(x, session, device, buckets=PowerOfTwoBuckets())
+    conv_1d(x, k, session, device, buckets=lambda n: -(-n // 4096) * 4096)
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+BucketPolicy = Callable[[int], int]
+
+
+@dataclass(frozen=True)
+class PowerOfTwoBuckets:
+    """Round sizes up to the next power of two, and to at least `min_size`.
+
+    Sizes up to N compile at most log2(N) + 1 variants per op, at the cost
+    of up to twice the work. Raise `min_size` to fold small sizes together.
+    """
+
+    min_size: int = 1
+
+    def __call__(self, size: int) -> int:
+        if size <= self.min_size:
+            return self.min_size
+        return 1 << (size - 1).bit_length()
+
+
+def bucket_size(size: int, buckets: Optional[BucketPolicy]) -> int:
+    """`size` rounded up by `buckets`, or unchanged without a policy."""
+    if buckets is None:
+        return size
+    bucketed = buckets(size)
+    if bucketed < size:
+        raise ValueError(f"bucket policy shrank size {size} to {bucketed}")
+    return bucketed
+
+
+def pad_to(
+    array: NDArray, shape: tuple[int, ...], value: float = 0.0
+) -> NDArray:
+    """`array` padded at the end of each axis up to `shape` with `value`."""
+    pad = [(0, target - current) for current, target in zip(array.shape, shape)]
+    if not any(after for _, after in pad):
+        return array
+    return np.pad(array, pad, constant_values=value)
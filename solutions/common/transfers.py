@@ -0,0 +1,99 @@
+"""
+Device-resident inputs and outputs for the custom-op host drivers (p15-p17).
+
+The entry points accept NumPy arrays or driver `Tensor`s. NumPy inputs are
+uploaded and the result is copied back to the host, as a one-off call
+expects. Tensor inputs already on the target device are used in place and
+the result is left on the device, so chained calls only copy data at the
+edges of a pipeline. Every copy made through `to_device()` and `to_host()` is
+counted in `TRANSFERS`, which may be updated from several threads at once.
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Union
+
+import numpy as np
+from max.driver import CPU, Device, Tensor
+from max.dtype import DType
+from numpy.typing import NDArray
+
+from .dtypes import to_tensor
+
+ArrayOrTensor = Union[NDArray[np.float32], Tensor]
+
+
+@dataclass
+class TransferStats:
+    """Bytes copied between the host and devices by the drivers."""
+
+    host_to_device_bytes: int = 0
+    device_to_host_bytes: int = 0
+    # Pipelines copy from worker threads; `+=` on an attribute is not atomic
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    @property
+    def total_bytes(self) -> int:
+        return self.host_to_device_bytes + self.device_to_host_bytes
+
+    def add(self, host_to_device: int = 0, device_to_host: int = 0) -> None:
+        with self._lock:
+            self.host_to_device_bytes += host_to_device
+            self.device_to_host_bytes += device_to_host
+
+    def reset(self) -> None:
+        with self._lock:
+            self.host_to_device_bytes = 0
+            self.device_to_host_bytes = 0
+
+
+TRANSFERS = TransferStats()
+
+
+def tensor_bytes(tensor: Tensor) -> int:
+    return math.prod(tensor.shape) * tensor.dtype.size_in_bytes
+
+
+def move(tensor: Tensor, device: Device) -> Tensor:
+    """`tensor` on `device`, copying (and counting the copy) only if needed."""
+    if tensor.device == device:
+        return tensor
+    if device == CPU():
+        TRANSFERS.add(device_to_host=tensor_bytes(tensor))
+    elif tensor.device == CPU():
+        TRANSFERS.add(host_to_device=tensor_bytes(tensor))
+    return tensor.to(device)
+
+
+def to_device(value: ArrayOrTensor, dtype: DType, device: Device) -> Tensor:
+    """Upload a NumPy array as `dtype`, or move a Tensor of that dtype."""
+    if isinstance(value, Tensor):
+        if value.dtype != dtype:
+            raise ValueError(f"expected a {dtype} tensor, got {value.dtype}")
+        return move(value, device)
+    return move(to_tensor(value, dtype), device)
+
+
+def to_host(tensor: Tensor) -> Tensor:
+    return move(tensor, CPU())
+
+
+def finish(result: Tensor, keep_on_device: bool) -> Tensor:
+    """An entry point's result: left in place for Tensor inputs, else on host."""
+    return result if keep_on_device else to_host(result)
+
+
+def reshape(value: ArrayOrTensor, shape: tuple[int, ...]) -> ArrayOrTensor:
+    """Reshape an array, or view a contiguous Tensor with a new shape."""
+    if isinstance(value, Tensor):
+        return value.view(value.dtype, shape)
+    return value.reshape(shape)
+
+
+def require_arrays(*values: ArrayOrTensor, reason: str) -> None:
+    """Reject Tensor inputs for code paths that work on host arrays."""
+    if any(isinstance(value, Tensor) for value in values):
+        raise ValueError(f"{reason} needs NumPy inputs, not device Tensors")
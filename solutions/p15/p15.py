@@ -1,4 +1,11 @@
+import asyncio
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
 
 import numpy as np
 from max.driver import CPU, Accelerator, Device, Tensor, accelerator_count
@@ -7,34 +14,62 @@ from max.engine import InferenceSession
 from max.graph import DeviceRef, Graph, TensorType, ops
 from numpy.typing import NDArray
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.async_pipeline import DevicePipeline  # noqa: E402
+from common.dtypes import (  # noqa: E402
+    TOLERANCES,
+    check_dtype,
+    round_to_dtype,
+    to_numpy,
+    to_tensor,
+)
+from common.model_cache import (  # noqa: E402
+    DiskModelCache,
+    ModelCache,
+    device_key,
+)
+from common.op_package import ensure_op_package, hash_op_package  # noqa: E402
+from common.shape_buckets import (  # noqa: E402
+    BucketPolicy,
+    PowerOfTwoBuckets,
+    bucket_size,
+    pad_to,
+)
+from common.transfers import (  # noqa: E402
+    ArrayOrTensor,
+    finish,
+    require_arrays,
+    reshape,
+    to_device,
+    to_host,
+)
 
-def conv_1d(
-    input: NDArray[np.float32],
-    kernel: NDArray[np.float32],
-    session: InferenceSession,
-    device: Device,
-) -> Tensor:
-    dtype = DType.float32
 
-    # Create driver tensors from the input arrays and move them to the target device
-    input_tensor = Tensor.from_numpy(input).to(device)
-    kernel_tensor = Tensor.from_numpy(kernel).to(device)
+MODEL_CACHE = ModelCache(disk_cache=DiskModelCache.from_env())
 
-    # Path to the directory containing our Mojo operations
-    mojo_kernels = Path(__file__).parent / "op"
+# Inputs the single-signal op covers with TPB * BLOCKS_PER_GRID in op/conv1d.mojo
+SINGLE_OP_MAX_SIZE = 30
 
+
+def build_conv_1d_graph(
+    input_shape: tuple[int, ...],
+    kernel_shape: tuple[int, ...],
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
     # Configure our graph with the custom conv1d operation
     with Graph(
         "conv_1d_graph",
         input_types=[
             TensorType(
                 dtype,
-                shape=input_tensor.shape,
+                shape=input_shape,
                 device=DeviceRef.from_device(device),
             ),
             TensorType(
                 dtype,
-                shape=kernel_tensor.shape,
+                shape=kernel_shape,
                 device=DeviceRef.from_device(device),
             ),
         ],
@@ -56,24 +91,492 @@ def conv_1d(
                 )
             ],
             parameters={
-                "input_size": input_tensor.shape[0],
-                "conv_size": kernel_tensor.shape[0],
+                "input_size": input_shape[0],
+                "conv_size": kernel_shape[0],
                 "dtype": dtype,
             },
         )[0].tensor
         graph.output(output)
 
-    # Compile the graph
     print("Compiling 1D convolution graph...")
-    model = session.load(graph)
+    return graph
+
+
+def conv_1d(
+    input: ArrayOrTensor,
+    kernel: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+    algorithm: str = "auto",
+    cost_model: Optional["ConvCostModel"] = None,
+    dtype: DType = DType.float32,
+    buckets: Optional[BucketPolicy] = None,
+) -> Tensor:
+    """
+    Run the custom conv1d op on `device`.
+
+    Compiled models are reused from `cache` (the module-level `MODEL_CACHE` by
+    default) across calls with the same shapes, dtype, device and `op/`
+    sources. Call `MODEL_CACHE.clear()` to force recompilation.
+
+    `algorithm` is "direct" for the sliding-window op, "fft" for the
+    FFT-based `fft_conv_1d()`, or "auto" to let `cost_model` (the module-level
+    `CONV_COST_MODEL` by default) pick the cheaper one for these sizes.
+
+    `dtype` is the element type on the device (float32, float16 or
+    bfloat16); the op accumulates in float32 and the result is in `dtype`.
+    With a `buckets` policy (see common/shape_buckets.py) the input length is
+    rounded up so one compiled model serves every length in a bucket. The FFT
+    path rounds the inputs to `dtype` as the op would, so both algorithms see
+    the same values; it compiles nothing, so `buckets` does not apply to it.
+
+    `input` and `kernel` may be NumPy arrays, which are uploaded and give a
+    result on the host, or device `Tensor`s, which are used in place and
+    give a result left on `device` (see common/transfers.py).
+    """
+    check_dtype(dtype)
+    on_device = isinstance(input, Tensor)
+    if algorithm == "auto":
+        cost_model = cost_model or CONV_COST_MODEL
+        algorithm = cost_model.choose(input.shape[0], kernel.shape[0])
+        if on_device:
+            # Keep device-resident data on the device
+            algorithm = "direct"
+    if algorithm == "fft":
+        require_arrays(input, kernel, reason="the host FFT algorithm")
+        return to_tensor(
+            fft_conv_1d(
+                round_to_dtype(input, dtype), round_to_dtype(kernel, dtype)
+            ),
+            dtype,
+        )
+    if algorithm != "direct":
+        raise ValueError(f"unknown conv_1d algorithm: {algorithm!r}")
+    if (
+        input.shape[0] > SINGLE_OP_MAX_SIZE
+        or device == CPU()
+        or dtype != DType.float32
+        or buckets is not None
+    ):
+        # The puzzle op has a fixed grid, no CPU kernel and accumulates in dtype
+        result = conv_1d_batched(
+            reshape(input, (1, input.shape[0])),
+            kernel,
+            session,
+            device,
+            cache,
+            dtype=dtype,
+            buckets=buckets,
+        )
+        return reshape(result, (input.shape[0],))
+
+    # Create driver tensors from the input arrays and move them to the target device
+    input_tensor = to_device(input, dtype, device)
+    kernel_tensor = to_device(kernel, dtype, device)
+
+    # Path to the directory containing our Mojo operations
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+
+    input_shape = tuple(input_tensor.shape)
+    kernel_shape = tuple(kernel_tensor.shape)
+    key = (
+        "conv1d",
+        input_shape,
+        kernel_shape,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_conv_1d_graph(
+            input_shape, kernel_shape, dtype, device, mojo_kernels
+        ),
+        custom_extensions=[mojo_kernels],
+    )
 
     # Execute the operation
     print("Executing 1D convolution...")
     result = model.execute(input_tensor, kernel_tensor)[0]
 
-    # Copy values back to the CPU to be read
+    # Copy values back to the CPU to be read, unless the caller keeps them
+    assert isinstance(result, Tensor)
+    return finish(result, on_device)
+
+
+# Largest grid dimension along y, which the batched op uses for rows
+MAX_GPU_BATCH = 65535
+# Threads per block of the batched op (BATCHED_TPB in op/conv1d.mojo)
+BATCHED_TPB = 128
+# Static shared memory a kernel can use on every supported GPU
+STATIC_SHARED_MEMORY_BYTES = 48 * 1024
+
+
+def max_gpu_conv_size(dtype: DType) -> int:
+    """Longest kernel whose block, halo and taps fit in shared memory."""
+    elements = STATIC_SHARED_MEMORY_BYTES // dtype.size_in_bytes
+    return (elements - BATCHED_TPB + 1) // 2
+
+
+def build_conv_1d_batched_graph(
+    input_shape: tuple[int, ...],
+    kernel_shape: tuple[int, ...],
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
+    with Graph(
+        "conv_1d_batched_graph",
+        input_types=[
+            TensorType(
+                dtype,
+                shape=input_shape,
+                device=DeviceRef.from_device(device),
+            ),
+            TensorType(
+                dtype,
+                shape=kernel_shape,
+                device=DeviceRef.from_device(device),
+            ),
+        ],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        input_value, kernel_value = graph.inputs
+
+        # Note: the name must match `@compiler.register("conv1d_batched")` in op/conv1d.mojo
+        output = ops.custom(
+            name="conv1d_batched",
+            values=[input_value, kernel_value],
+            out_types=[
+                TensorType(
+                    dtype=input_value.tensor.dtype,
+                    shape=input_value.tensor.shape,
+                    device=DeviceRef.from_device(device),
+                )
+            ],
+            parameters={
+                "batch_size": input_shape[0],
+                "input_size": input_shape[1],
+                "conv_size": kernel_shape[1],
+                "kernel_batch": kernel_shape[0],
+                "dtype": dtype,
+            },
+        )[0].tensor
+        graph.output(output)
+
+    print("Compiling batched 1D convolution graph...")
+    return graph
+
+
+def conv_1d_batched(
+    input: ArrayOrTensor,
+    kernel: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+    buckets: Optional[BucketPolicy] = None,
+) -> Tensor:
+    """
+    Convolve every row of a (batch, length) input in one graph execution.
+
+    Args:
+        input: Signals of shape (batch, length)
+        kernel: One kernel of shape (conv_size,) shared by every row, or one
+            kernel per row of shape (batch, conv_size)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        cache: Compiled model cache, shared by all calls by default
+        dtype: Element type on the device; sums accumulate in float32
+        buckets: Optional policy rounding batch and length up; rows and
+            samples are zero-padded, which leaves the real outputs unchanged
+
+    Returns:
+        Output of shape (batch, length) with the same zero padding past the
+        end of each row as `conv_1d()`, on the host for NumPy inputs and on
+        `device` for Tensor inputs
+    """
+    check_dtype(dtype)
+    on_device = isinstance(input, Tensor)
+    if len(input.shape) != 2:
+        raise ValueError(
+            f"expected a (batch, length) input, got shape {input.shape}"
+        )
+    if len(kernel.shape) == 1:
+        kernel = reshape(kernel, (1, kernel.shape[0]))
+    if len(kernel.shape) != 2 or kernel.shape[0] not in (1, input.shape[0]):
+        raise ValueError(
+            f"kernel of shape {kernel.shape} does not match {input.shape[0]} rows"
+        )
+    if device != CPU() and input.shape[0] > MAX_GPU_BATCH:
+        raise ValueError(
+            f"{input.shape[0]} rows exceed the GPU grid limit of {MAX_GPU_BATCH}"
+        )
+    if device != CPU() and kernel.shape[1] > max_gpu_conv_size(dtype):
+        raise ValueError(
+            f"a {kernel.shape[1]}-tap kernel exceeds the GPU op's shared "
+            f"memory limit of {max_gpu_conv_size(dtype)} {dtype} taps; use "
+            'conv_1d(..., algorithm="fft")'
+        )
+
+    batch, length = input.shape
+    padded_batch = bucket_size(batch, buckets)
+    if device != CPU():
+        padded_batch = min(padded_batch, MAX_GPU_BATCH)
+    padded_shape = (padded_batch, bucket_size(length, buckets))
+    if buckets is not None:
+        require_arrays(input, kernel, reason="padding to a bucket")
+        input = pad_to(input, padded_shape)
+        if kernel.shape[0] > 1:
+            kernel = pad_to(kernel, (padded_batch, kernel.shape[1]))
+
+    input_tensor = to_device(input, dtype, device)
+    kernel_tensor = to_device(kernel, dtype, device)
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+
+    input_shape = tuple(input_tensor.shape)
+    kernel_shape = tuple(kernel_tensor.shape)
+    key = (
+        "conv1d_batched",
+        input_shape,
+        kernel_shape,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_conv_1d_batched_graph(
+            input_shape, kernel_shape, dtype, device, mojo_kernels
+        ),
+        custom_extensions=[mojo_kernels],
+    )
+
+    print("Executing batched 1D convolution...")
+    result = model.execute(input_tensor, kernel_tensor)[0]
     assert isinstance(result, Tensor)
-    return result.to(CPU())
+    if padded_shape != (batch, length):
+        return to_tensor(to_numpy(to_host(result))[:batch, :length], dtype)
+    return finish(result, on_device)
+
+
+def conv_1d_stream(
+    signal: Union[NDArray[np.float32], Iterable[NDArray[np.float32]]],
+    kernel: NDArray[np.float32],
+    session: InferenceSession,
+    device: Device,
+    chunk_size: int = 1 << 20,
+    cache: ModelCache = MODEL_CACHE,
+) -> Iterator[NDArray[np.float32]]:
+    """
+    Overlap-save 1D convolution of a signal that does not fit on the device.
+
+    Args:
+        signal: A (possibly memory-mapped) 1D array, or an iterable of 1D
+            blocks of any size making up the signal
+        kernel: Convolution kernel of shape (conv_size,)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        chunk_size: Number of output samples computed per graph execution
+        cache: Compiled model cache, shared by all calls by default
+
+    Yields:
+        Consecutive output chunks of `chunk_size` samples (the last one may
+        be shorter); concatenated they equal `conv_1d()` of the whole signal.
+
+    Each execution sees a window of `chunk_size + conv_size - 1` samples: the
+    chunk plus the halo its last outputs read. The final window is zero
+    padded, so every chunk reuses one compiled model and host memory stays
+    at a single window regardless of the signal length.
+    """
+    halo = kernel.shape[0] - 1
+    window = np.zeros((1, chunk_size + halo), dtype=np.float32)
+    if isinstance(signal, np.ndarray):
+        blocks = (
+            signal[start : start + chunk_size]
+            for start in range(0, signal.shape[0], chunk_size)
+        )
+    else:
+        blocks = iter(signal)
+
+    def run_window() -> NDArray[np.float32]:
+        result = conv_1d_batched(window, kernel, session, device, cache)
+        return result.to_numpy()[0]
+
+    filled = 0
+    for block in blocks:
+        block = np.asarray(block, dtype=np.float32)
+        pos = 0
+        while pos < block.shape[0]:
+            take = min(window.shape[1] - filled, block.shape[0] - pos)
+            window[0, filled : filled + take] = block[pos : pos + take]
+            filled += take
+            pos += take
+            if filled == window.shape[1]:
+                yield run_window()[:chunk_size]
+                # The halo is the start of the next window
+                window[0, :halo] = window[0, chunk_size:]
+                filled = halo
+
+    # Outputs for the samples still in the window, zero padded on the right
+    if filled > 0:
+        window[0, filled:] = 0
+        yield run_window()[:filled]
+
+
+async def conv_1d_async(
+    input: ArrayOrTensor,
+    kernel: ArrayOrTensor,
+    session: InferenceSession,
+    pipeline: DevicePipeline,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+) -> Tensor:
+    """
+    Awaitable `conv_1d()` on `pipeline.device`, with the result on the host.
+
+    Concurrent calls through one pipeline overlap their uploads, executions
+    and downloads (see common/async_pipeline.py).
+    """
+    return await pipeline.run(
+        lambda input, kernel: conv_1d(
+            input, kernel, session, pipeline.device, cache, dtype=dtype
+        ),
+        [input, kernel],
+        dtype,
+    )
+
+
+def reference_conv_1d(
+    input: NDArray[np.float32], kernel: NDArray[np.float32]
+) -> NDArray[np.float32]:
+    """
+    NumPy reference for the conv1d ops.
+
+    Computes `out[..., i] = sum_j input[..., i + j] * kernel[..., j]`, reading
+    zeros past the right end of the input, exactly like the kernels. Inputs
+    may be (length,) or (batch, length), with a (conv_size,) kernel or one
+    kernel per row of shape (batch, conv_size). The sliding windows are
+    strided views, so only the padded input and the output are allocated.
+    """
+    conv_size = kernel.shape[-1]
+    padding = [(0, 0)] * (input.ndim - 1) + [(0, conv_size - 1)]
+    windows = np.lib.stride_tricks.sliding_window_view(
+        np.pad(input, padding), conv_size, axis=-1
+    )
+    if kernel.ndim == 2:
+        # One kernel per row broadcasts over that row's windows
+        kernel = kernel[:, np.newaxis, :]
+    return np.einsum("...k,...k->...", windows, kernel).astype(np.float32)
+
+
+def fft_conv_1d(
+    input: NDArray[np.float32], kernel: NDArray[np.float32]
+) -> NDArray[np.float32]:
+    """
+    FFT-based equivalent of the conv1d op, O((N + K) log(N + K)) on the host.
+
+    The op computes a correlation, `out[i] = sum_j input[i + j] * kernel[j]`,
+    which is a convolution with the reversed kernel shifted by K - 1. Padding
+    the transform to at least N + K - 1 points avoids circular wrap-around,
+    so samples past the end of the input read as zeros like in the op.
+    Works on the last axis, so (batch, length) inputs are supported too.
+    """
+    input_size = input.shape[-1]
+    conv_size = kernel.shape[-1]
+    fft_size = 1 << (input_size + conv_size - 2).bit_length()
+    spectrum = np.fft.rfft(input, fft_size) * np.fft.rfft(
+        kernel[..., ::-1], fft_size
+    )
+    full = np.fft.irfft(spectrum, fft_size)
+    return full[..., conv_size - 1 : conv_size - 1 + input_size].astype(np.float32)
+
+
+@dataclass
+class ConvCostModel:
+    """
+    Predicted run time of the direct and FFT conv_1d paths.
+
+    The direct op does input_size * conv_size multiply-adds, while the FFT
+    path does roughly fft_size * log2(fft_size) work. The defaults are
+    rough per-unit costs of the direct CPU kernel and NumPy's FFT, which put
+    the crossover at kernels of about 60 taps for 8192-sample inputs: small
+    kernels run direct and large ones through the FFT. Use
+    `calibrate_conv_1d()` to fit them for a given machine and device.
+    """
+
+    direct_seconds_per_mac: float = 5e-10
+    fft_seconds_per_point: float = 1e-9
+    fixed_overhead_seconds: float = 0.0
+
+    def direct_cost(self, input_size: int, conv_size: int) -> float:
+        return self.direct_seconds_per_mac * input_size * conv_size
+
+    def fft_cost(self, input_size: int, conv_size: int) -> float:
+        fft_size = 1 << (input_size + conv_size - 2).bit_length()
+        return (
+            self.fft_seconds_per_point * fft_size * np.log2(fft_size)
+            + self.fixed_overhead_seconds
+        )
+
+    def choose(self, input_size: int, conv_size: int) -> str:
+        if self.fft_cost(input_size, conv_size) < self.direct_cost(
+            input_size, conv_size
+        ):
+            return "fft"
+        return "direct"
+
+
+CONV_COST_MODEL = ConvCostModel()
+
+
+def calibrate_conv_1d(
+    session: InferenceSession,
+    device: Device,
+    sizes: tuple[tuple[int, int], ...] = ((4096, 8), (4096, 64), (16384, 256)),
+    repeats: int = 5,
+) -> ConvCostModel:
+    """
+    Fit a `ConvCostModel` from a small benchmark of both paths on `device`.
+
+    Each (input_size, conv_size) pair is run once to compile, then timed
+    `repeats` times per path; the coefficients are the medians of time per
+    unit of work. Both paths are also checked to agree on every sample.
+    Assign the result to `CONV_COST_MODEL` or pass it to `conv_1d()`.
+    """
+    direct_rates = []
+    fft_rates = []
+    for input_size, conv_size in sizes:
+        input = np.random.randn(input_size).astype(np.float32)
+        kernel = np.random.randn(conv_size).astype(np.float32)
+        timings = {}
+        for algorithm in ("direct", "fft"):
+            result = conv_1d(input, kernel, session, device, algorithm=algorithm)
+            timings[algorithm] = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                conv_1d(input, kernel, session, device, algorithm=algorithm)
+                timings[algorithm].append(time.perf_counter() - start)
+            if algorithm == "direct":
+                direct_result = result.to_numpy()
+            else:
+                np.testing.assert_allclose(
+                    result.to_numpy(), direct_result, rtol=1e-4, atol=1e-3
+                )
+
+        fft_size = 1 << (input_size + conv_size - 2).bit_length()
+        direct_rates.append(np.median(timings["direct"]) / (input_size * conv_size))
+        fft_rates.append(
+            np.median(timings["fft"]) / (fft_size * np.log2(fft_size))
+        )
+
+    return ConvCostModel(
+        direct_seconds_per_mac=float(np.median(direct_rates)),
+        fft_seconds_per_point=float(np.median(fft_rates)),
+    )
 
 
 if __name__ == "__main__":
@@ -91,11 +594,7 @@ if __name__ == "__main__":
     kernel = np.arange(KERNEL_SIZE, dtype=np.float32)
 
     # Calculate expected result using NumPy
-    expected_result = np.zeros_like(input_array, dtype=np.float32)
-    for i in range(INPUT_SIZE):
-        for j in range(KERNEL_SIZE):
-            if i + j < INPUT_SIZE:
-                expected_result[i] += input_array[i + j] * kernel[j]
+    expected_result = reference_conv_1d(input_array, kernel)
 
     print(f"Input array: {input_array}")
     print(f"Convolution kernel: {kernel}")
@@ -108,3 +607,208 @@ if __name__ == "__main__":
     # Verify results match
     np.testing.assert_allclose(result.to_numpy(), expected_result, rtol=1e-5)
     print("Verification passed: Custom kernel results match NumPy calculation")
+
+    # Calling again with the same shapes reuses the compiled model
+    conv_1d(input_array * 2, kernel, session, device)
+    assert MODEL_CACHE.hits == 1 and MODEL_CACHE.misses == 1
+    print("Model cache hit: second call skipped compilation")
+
+    # Many short signals in a single graph execution
+    BATCH = 64
+    SIGNAL_SIZE = 300
+    signals = np.random.randn(BATCH, SIGNAL_SIZE).astype(np.float32)
+    row_kernels = np.random.randn(BATCH, KERNEL_SIZE).astype(np.float32)
+    for batch_kernel in (kernel, row_kernels):
+        expected_batched = reference_conv_1d(signals, batch_kernel)
+        batched_result = conv_1d_batched(signals, batch_kernel, session, device)
+        np.testing.assert_allclose(
+            batched_result.to_numpy(), expected_batched, rtol=1e-4, atol=1e-4
+        )
+    print("Verification passed: batched kernel matches NumPy calculation")
+
+    # 16-bit inputs, checked against NumPy on the same rounded values
+    for half_dtype in (DType.float16, DType.bfloat16):
+        rtol, atol = TOLERANCES[half_dtype]
+        expected_half = reference_conv_1d(
+            round_to_dtype(signals, half_dtype), round_to_dtype(kernel, half_dtype)
+        )
+        half_result = conv_1d_batched(
+            signals, kernel, session, device, dtype=half_dtype
+        )
+        assert half_result.dtype == half_dtype
+        np.testing.assert_allclose(
+            to_numpy(half_result), expected_half, rtol=rtol, atol=atol
+        )
+        single_half = conv_1d(
+            signals[0], kernel, session, device, algorithm="direct", dtype=half_dtype
+        )
+        np.testing.assert_allclose(
+            to_numpy(single_half), expected_half[0], rtol=rtol, atol=atol
+        )
+        fft_half = conv_1d(
+            signals[0], kernel, session, device, algorithm="fft", dtype=half_dtype
+        )
+        np.testing.assert_allclose(
+            to_numpy(fft_half), expected_half[0], rtol=rtol, atol=atol
+        )
+    print("Verification passed: float16 and bfloat16 convolutions match NumPy")
+
+    # Bucketed lengths share one compiled model per power of two
+    BUCKET_LENGTHS = [257, 300, 400, 511, 512]
+    bucket_cache = ModelCache()
+    for bucket_length in BUCKET_LENGTHS:
+        bucket_signal = np.random.randn(bucket_length).astype(np.float32)
+        bucket_result = conv_1d(
+            bucket_signal,
+            kernel,
+            session,
+            device,
+            cache=bucket_cache,
+            algorithm="direct",
+            buckets=PowerOfTwoBuckets(),
+        )
+        np.testing.assert_allclose(
+            bucket_result.to_numpy(),
+            reference_conv_1d(bucket_signal, kernel),
+            rtol=1e-4,
+            atol=1e-4,
+        )
+    assert bucket_cache.misses == 1, bucket_cache.misses
+    print(f"Verification passed: {len(BUCKET_LENGTHS)} lengths, one compiled model")
+
+    # Stream a signal in fixed-size chunks, from ragged blocks and from a memmap
+    STREAM_SIZE = 5000
+    CHUNK_SIZE = 512
+    stream_signal = np.random.randn(STREAM_SIZE).astype(np.float32)
+    expected_stream = reference_conv_1d(stream_signal, kernel)
+    ragged_blocks = np.array_split(stream_signal, [100, 101, 1700, 4321])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mmap_path = Path(tmp_dir) / "signal.npy"
+        np.save(mmap_path, stream_signal)
+        for source in (ragged_blocks, np.load(mmap_path, mmap_mode="r")):
+            chunks = list(
+                conv_1d_stream(
+                    source, kernel, session, device, chunk_size=CHUNK_SIZE
+                )
+            )
+            assert all(len(chunk) == CHUNK_SIZE for chunk in chunks[:-1])
+            np.testing.assert_allclose(
+                np.concatenate(chunks), expected_stream, rtol=1e-4, atol=1e-4
+            )
+    print("Verification passed: streamed chunks match NumPy calculation")
+
+    # FFT path agrees with the direct op, and the calibrated dispatcher picks one
+    fft_signal = np.random.randn(8192).astype(np.float32)
+    for fft_kernel_size, expected_algorithm in (
+        (KERNEL_SIZE, "direct"),
+        (257, "fft"),
+    ):
+        fft_kernel = np.random.randn(fft_kernel_size).astype(np.float32)
+        direct_result = conv_1d(
+            fft_signal, fft_kernel, session, device, algorithm="direct"
+        )
+        fft_result = conv_1d(fft_signal, fft_kernel, session, device, algorithm="fft")
+        np.testing.assert_allclose(
+            fft_result.to_numpy(), direct_result.to_numpy(), rtol=1e-4, atol=1e-3
+        )
+        # Uncalibrated, "auto" still takes the FFT path for large kernels
+        chosen = CONV_COST_MODEL.choose(fft_signal.shape[0], fft_kernel_size)
+        assert chosen == expected_algorithm, (fft_kernel_size, chosen)
+        auto_result = conv_1d(fft_signal, fft_kernel, session, device)
+        np.testing.assert_allclose(
+            auto_result.to_numpy(), direct_result.to_numpy(), rtol=1e-4, atol=1e-3
+        )
+    cost_model = calibrate_conv_1d(session, device)
+    print(f"Calibrated conv_1d cost model: {cost_model}")
+    for sizes in ((8192, KERNEL_SIZE), (8192, 257)):
+        print(f"conv_1d{sizes} dispatches to: {cost_model.choose(*sizes)}")
+    print("Verification passed: FFT path matches the direct kernel")
+
+    # Kernels past the batched op's shared memory are refused on the GPU
+    if device != CPU():
+        oversized = np.zeros(max_gpu_conv_size(DType.float32) + 1, np.float32)
+        try:
+            conv_1d(fft_signal, oversized, session, device, algorithm="direct")
+        except ValueError as error:
+            print(f"Verification passed: oversized kernel rejected: {error}")
+        else:
+            raise AssertionError("conv_1d accepted an oversized GPU kernel")
+
+    # Many requests in flight at once through the asyncio pipeline, on the
+    # device and through the CPU thread-pool fallback
+    async def convolve_all(
+        signals: list[NDArray[np.float32]],
+        async_session: InferenceSession,
+        async_device: Device,
+    ) -> list[Tensor]:
+        async with DevicePipeline(async_device, max_in_flight=4) as pipeline:
+            return await asyncio.gather(
+                *(
+                    conv_1d_async(signal, kernel, async_session, pipeline)
+                    for signal in signals
+                )
+            )
+
+    async_signals = [np.random.randn(4096).astype(np.float32) for _ in range(16)]
+    async_targets = [(session, device)]
+    if device != CPU():
+        async_targets.append((InferenceSession(devices=[CPU()]), CPU()))
+    for async_session, async_device in async_targets:
+        async_results = asyncio.run(
+            convolve_all(async_signals, async_session, async_device)
+        )
+        for signal, async_result in zip(async_signals, async_results):
+            np.testing.assert_allclose(
+                async_result.to_numpy(),
+                reference_conv_1d(signal, kernel),
+                rtol=1e-4,
+                atol=1e-4,
+            )
+        print(
+            f"Verification passed: {len(async_signals)} async requests "
+            f"on {async_device}"
+        )
+
+    # Concurrent misses on one key compile a single model
+    shared_cache = ModelCache()
+    with ThreadPoolExecutor(8) as workers:
+        concurrent_results = list(
+            workers.map(
+                lambda signal: conv_1d(
+                    signal, kernel, session, device, shared_cache, "direct"
+                ),
+                async_signals,
+            )
+        )
+    assert shared_cache.misses == 1, shared_cache.misses
+    for signal, concurrent_result in zip(async_signals, concurrent_results):
+        np.testing.assert_allclose(
+            concurrent_result.to_numpy(),
+            reference_conv_1d(signal, kernel),
+            rtol=1e-4,
+            atol=1e-4,
+        )
+    print(
+        f"Verification passed: {len(async_signals)} concurrent calls "
+        "compiled once"
+    )
+
+    # A disk cache that cannot store (full, read-only, no export) only logs;
+    # the compiled model is still returned and kept in memory
+    class FailingDiskCache(DiskModelCache):
+        def store(self, key, model):
+            raise OSError("No space left on device")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        failing_cache = ModelCache(disk_cache=FailingDiskCache(Path(tmp_dir)))
+        stored_result = conv_1d(
+            async_signals[0], kernel, session, device, failing_cache, "direct"
+        )
+    np.testing.assert_allclose(
+        stored_result.to_numpy(),
+        reference_conv_1d(async_signals[0], kernel),
+        rtol=1e-4,
+        atol=1e-4,
+    )
+    assert len(failing_cache) == 1, len(failing_cache)
+    print("Verification passed: a failing disk cache store is not fatal")
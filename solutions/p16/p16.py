@@ -1,4 +1,7 @@
+import asyncio
+import sys
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 from max.driver import CPU, Accelerator, Device, Tensor, accelerator_count
@@ -6,17 +9,52 @@ from max.dtype import DType
 from max.engine import InferenceSession
 from max.graph import DeviceRef, Graph, TensorType, ops
 from numpy.typing import NDArray
+from scipy.special import log_softmax as scipy_log_softmax
 from scipy.special import softmax as scipy_softmax
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.async_pipeline import DevicePipeline  # noqa: E402
+from common.dtypes import (  # noqa: E402
+    LOWEST,
+    TOLERANCES,
+    check_dtype,
+    round_to_dtype,
+    to_numpy,
+    to_tensor,
+)
+from common.model_cache import (  # noqa: E402
+    DiskModelCache,
+    ModelCache,
+    device_key,
+)
+from common.op_package import ensure_op_package, hash_op_package  # noqa: E402
+from common.shape_buckets import (  # noqa: E402
+    BucketPolicy,
+    PowerOfTwoBuckets,
+    bucket_size,
+    pad_to,
+)
+from common.transfers import (  # noqa: E402
+    ArrayOrTensor,
+    finish,
+    require_arrays,
+    reshape,
+    to_device,
+    to_host,
+)
 
-def softmax(
-    input: NDArray[np.float32],
-    session: InferenceSession,
+MODEL_CACHE = ModelCache(disk_cache=DiskModelCache.from_env())
+
+# Threads per block of the softmax ops in op/softmax.mojo
+TPB = 128
+
+
+def build_softmax_graph(
+    input_tensor: Tensor,
+    dtype: DType,
     device: Device,
-) -> Tensor:
-    dtype = DType.float32
-    input_tensor = Tensor.from_numpy(input).to(device)
-    mojo_kernels = Path(__file__).parent / "op"
+    mojo_kernels: Path,
+) -> Graph:
     # ANCHOR: softmax_custom_op_graph_solution
     with Graph(
         "softmax_graph",
@@ -53,11 +91,350 @@ def softmax(
     # ANCHOR_END: softmax_custom_op_graph_solution
 
     print(f"Compiling softmax graph on {device}")
-    model = session.load(graph)
+    return graph
+
+
+def softmax(
+    input: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+    buckets: Optional[BucketPolicy] = None,
+) -> Tensor:
+    """
+    Softmax of a 1D input.
+
+    Inputs that fit in one thread block use the `softmax` op; longer ones
+    switch to the multi-block `softmax_online` op. float16 and bfloat16
+    inputs, and bucketed lengths (see `softmax_batched()`), go through the
+    row-wise `softmax_batched` op, which accumulates in float32.
+
+    A NumPy `input` is uploaded and the result returned on the host; a
+    `Tensor` input is used in place and the result left on `device`.
+    """
+    check_dtype(dtype)
+    if dtype != DType.float32 or buckets is not None:
+        result = softmax_batched(
+            reshape(input, (1, input.shape[0])),
+            session,
+            device,
+            cache,
+            dtype=dtype,
+            buckets=buckets,
+        )
+        return reshape(result, (input.shape[0],))
+    on_device = isinstance(input, Tensor)
+    input_tensor = to_device(input, dtype, device)
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+    input_size = input_tensor.shape[0]
+    op_name = "softmax_online" if input_size > TPB else "softmax"
+
+    def build_graph() -> Graph:
+        if op_name == "softmax":
+            return build_softmax_graph(
+                input_tensor, dtype, device, mojo_kernels
+            )
+        return build_softmax_variant_graph(
+            op_name,
+            (input_size,),
+            {"input_size": input_size},
+            dtype,
+            device,
+            mojo_kernels,
+        )
+
+    key = (
+        op_name,
+        tuple(input_tensor.shape),
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key, session, build_graph, custom_extensions=[mojo_kernels]
+    )
     print(f"Executing softmax on {device}")
     print("="*100)
     result = model.execute(input_tensor)[0]
     assert isinstance(result, Tensor)
+    return finish(result, on_device)
+
+
+def build_softmax_variant_graph(
+    op_name: str,
+    input_shape: tuple[int, ...],
+    parameters: dict,
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
+    """Graph running one of the other softmax ops registered in op/softmax.mojo."""
+    with Graph(
+        f"{op_name}_graph",
+        input_types=[
+            TensorType(
+                dtype,
+                shape=input_shape,
+                device=DeviceRef.from_device(device),
+            ),
+        ],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        input_value = graph.inputs[0]
+        output = ops.custom(
+            name=op_name,
+            values=[input_value],
+            out_types=[
+                TensorType(
+                    dtype=input_value.tensor.dtype,
+                    shape=input_value.tensor.shape,
+                    device=DeviceRef.from_device(device),
+                )
+            ],
+            parameters={**parameters, "dtype": dtype},
+        )[0].tensor
+        graph.output(output)
+
+    print(f"Compiling {op_name} graph on {device}")
+    return graph
+
+
+def softmax_batched(
+    input: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+    buckets: Optional[BucketPolicy] = None,
+) -> Tensor:
+    """
+    Softmax over each row of a (batch, row_size) input in one graph execution.
+
+    On GPU every row is reduced by its own thread block, so rows of any
+    length are supported and the batch only grows the grid. `dtype` may be
+    float32, float16 or bfloat16; the max and sum accumulate in float32.
+
+    With a `buckets` policy, batch and row_size are rounded up so one
+    compiled model serves every shape in a bucket. Rows are padded with the
+    lowest finite value of `dtype`, whose exponential underflows to zero, so
+    the real outputs are unchanged.
+
+    Tensor inputs are used in place and give a result left on `device`.
+    """
+    if len(input.shape) != 2 or 0 in input.shape:
+        raise ValueError(
+            f"expected a non-empty (batch, row_size) input, got shape "
+            f"{input.shape}"
+        )
+    check_dtype(dtype)
+    on_device = isinstance(input, Tensor)
+    batch, row_size = input.shape
+    padded_row_size = bucket_size(row_size, buckets)
+    padded_shape = (bucket_size(batch, buckets), padded_row_size)
+    if buckets is not None:
+        require_arrays(input, reason="padding to a bucket")
+        input = pad_to(input, (batch, padded_row_size), value=LOWEST[dtype])
+        input = pad_to(input, padded_shape)
+    input_tensor = to_device(input, dtype, device)
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+    input_shape = tuple(input_tensor.shape)
+    key = (
+        "softmax_batched",
+        input_shape,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_softmax_variant_graph(
+            "softmax_batched",
+            input_shape,
+            {"batch_size": input_shape[0], "row_size": input_shape[1]},
+            dtype,
+            device,
+            mojo_kernels,
+        ),
+        custom_extensions=[mojo_kernels],
+    )
+    print(f"Executing batched softmax on {device}")
+    result = model.execute(input_tensor)[0]
+    assert isinstance(result, Tensor)
+    if padded_shape != (batch, row_size):
+        return to_tensor(to_numpy(to_host(result))[:batch, :row_size], dtype)
+    return finish(result, on_device)
+
+
+async def softmax_async(
+    input: ArrayOrTensor,
+    session: InferenceSession,
+    pipeline: DevicePipeline,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+) -> Tensor:
+    """
+    Awaitable `softmax()` on `pipeline.device`, with the result on the host.
+
+    Concurrent calls through one pipeline overlap their uploads, executions
+    and downloads (see common/async_pipeline.py).
+    """
+    return await pipeline.run(
+        lambda input: softmax(
+            input, session, pipeline.device, cache, dtype=dtype
+        ),
+        [input],
+        dtype,
+    )
+
+
+def log_softmax(
+    input: NDArray[np.float32],
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+) -> Tensor:
+    """Row-wise log(softmax(x)) of a (batch, row_size) input, fused in one op."""
+    if input.ndim != 2 or input.size == 0:
+        raise ValueError(
+            f"expected a non-empty (batch, row_size) input, got shape "
+            f"{input.shape}"
+        )
+    dtype = DType.float32
+    input_tensor = Tensor.from_numpy(np.ascontiguousarray(input)).to(device)
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+    input_shape = tuple(input_tensor.shape)
+    key = (
+        "log_softmax",
+        input_shape,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_softmax_variant_graph(
+            "log_softmax",
+            input_shape,
+            {"batch_size": input_shape[0], "row_size": input_shape[1]},
+            dtype,
+            device,
+            mojo_kernels,
+        ),
+        custom_extensions=[mojo_kernels],
+    )
+    print(f"Executing log_softmax on {device}")
+    result = model.execute(input_tensor)[0]
+    assert isinstance(result, Tensor)
+    return result.to(CPU()) if device == Accelerator() else result
+
+
+def build_softmax_cross_entropy_graph(
+    logits_shape: tuple[int, ...],
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
+    batch_size, row_size = logits_shape
+    with Graph(
+        "softmax_cross_entropy_graph",
+        input_types=[
+            TensorType(
+                dtype,
+                shape=logits_shape,
+                device=DeviceRef.from_device(device),
+            ),
+            TensorType(
+                DType.int32,
+                shape=(batch_size,),
+                device=DeviceRef.from_device(device),
+            ),
+        ],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        logits_value, target_value = graph.inputs
+
+        # Note: the name must match `@compiler.register("softmax_cross_entropy")` in op/softmax.mojo
+        output = ops.custom(
+            name="softmax_cross_entropy",
+            values=[logits_value, target_value],
+            out_types=[
+                TensorType(
+                    dtype=dtype,
+                    shape=(batch_size,),
+                    device=DeviceRef.from_device(device),
+                )
+            ],
+            parameters={
+                "batch_size": batch_size,
+                "row_size": row_size,
+                "dtype": dtype,
+            },
+        )[0].tensor
+        graph.output(output)
+
+    print(f"Compiling softmax_cross_entropy graph on {device}")
+    return graph
+
+
+def softmax_cross_entropy(
+    logits: NDArray[np.float32],
+    target_index: NDArray[np.integer],
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+) -> Tensor:
+    """
+    Per-row loss -log(softmax(logits)[target_index]), fused in one op.
+
+    Args:
+        logits: Unnormalized scores of shape (batch, row_size)
+        target_index: Index of the target class in each row, shape (batch,)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        cache: Compiled model cache, shared by all calls by default
+
+    Returns:
+        Loss of shape (batch,); the probabilities never leave the device
+    """
+    if logits.ndim != 2 or logits.size == 0:
+        raise ValueError(
+            f"expected non-empty (batch, row_size) logits, got shape "
+            f"{logits.shape}"
+        )
+    batch_size, row_size = logits.shape
+    if target_index.shape != (batch_size,):
+        raise ValueError(
+            f"expected {batch_size} target indices, got shape {target_index.shape}"
+        )
+    if np.any((target_index < 0) | (target_index >= row_size)):
+        raise ValueError(f"target indices must be in [0, {row_size})")
+
+    dtype = DType.float32
+    logits_tensor = Tensor.from_numpy(np.ascontiguousarray(logits)).to(device)
+    target_tensor = Tensor.from_numpy(target_index.astype(np.int32)).to(device)
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+    logits_shape = tuple(logits_tensor.shape)
+    key = (
+        "softmax_cross_entropy",
+        logits_shape,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_softmax_cross_entropy_graph(
+            logits_shape, dtype, device, mojo_kernels
+        ),
+        custom_extensions=[mojo_kernels],
+    )
+    print(f"Executing softmax_cross_entropy on {device}")
+    result = model.execute(logits_tensor, target_tensor)[0]
+    assert isinstance(result, Tensor)
     return result.to(CPU()) if device == Accelerator() else result
 
 
@@ -84,3 +461,130 @@ if __name__ == "__main__":
     total_prob_gpu = np.round(np.sum(gpu_result.to_numpy()), 5)
     print(f"Sum of all probabilities on CPU: {total_prob_cpu}")
     print(f"Sum of all probabilities on GPU: {total_prob_gpu}")
+
+    # Row-wise softmax over a batch of rows longer than one thread block
+    BATCH = 1000
+    ROW_SIZE = 300
+    batched_input = np.random.randn(BATCH, ROW_SIZE).astype(np.float32)
+    expected_batched = scipy_softmax(batched_input, axis=1)
+    for batched_session, batched_device in (
+        (cpu_session, CPU()),
+        (gpu_session, Accelerator()),
+    ):
+        batched_result = softmax_batched(
+            batched_input, batched_session, batched_device
+        )
+        np.testing.assert_allclose(
+            batched_result.to_numpy(), expected_batched, rtol=1e-5, atol=1e-7
+        )
+    try:
+        softmax_batched(np.empty((0, ROW_SIZE), np.float32), cpu_session, CPU())
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("softmax_batched accepted an empty batch")
+    print("Verification passed: batched softmax matches SciPy calculation")
+
+    # Vectors longer than one block go through the multi-block online softmax
+    LONG_INPUT_SIZE = 100_000
+    long_input = np.random.randn(LONG_INPUT_SIZE).astype(np.float32) * 4
+    expected_long = scipy_softmax(long_input)
+    cpu_long = softmax(long_input, cpu_session, CPU()).to_numpy()
+    gpu_long = softmax(long_input, gpu_session, Accelerator()).to_numpy()
+    np.testing.assert_allclose(cpu_long, expected_long, rtol=1e-4, atol=1e-10)
+    np.testing.assert_allclose(gpu_long, cpu_long, rtol=1e-4, atol=1e-10)
+    print("Verification passed: multi-block softmax matches CPU and SciPy")
+
+    # 16-bit inputs, checked against SciPy on the same rounded values
+    for half_dtype in (DType.float16, DType.bfloat16):
+        rtol, atol = TOLERANCES[half_dtype]
+        expected_half = scipy_softmax(round_to_dtype(long_input, half_dtype))
+        expected_half_batched = scipy_softmax(
+            round_to_dtype(batched_input, half_dtype), axis=1
+        )
+        for half_session, half_device in (
+            (cpu_session, CPU()),
+            (gpu_session, Accelerator()),
+        ):
+            half_result = softmax(
+                long_input, half_session, half_device, dtype=half_dtype
+            )
+            assert half_result.dtype == half_dtype
+            np.testing.assert_allclose(
+                to_numpy(half_result), expected_half, rtol=rtol, atol=atol
+            )
+            half_batched = softmax_batched(
+                batched_input, half_session, half_device, dtype=half_dtype
+            )
+            np.testing.assert_allclose(
+                to_numpy(half_batched), expected_half_batched, rtol=rtol, atol=atol
+            )
+    print("Verification passed: float16 and bfloat16 softmax match SciPy")
+
+    # Bucketed shapes share one compiled model per power of two
+    bucket_cache = ModelCache()
+    bucket_shapes = [(3, 1000), (4, 700), (2, 513), (1, 1024)]
+    for bucket_shape in bucket_shapes:
+        bucket_input = np.random.randn(*bucket_shape).astype(np.float32) * 4
+        bucket_result = softmax_batched(
+            bucket_input,
+            gpu_session,
+            Accelerator(),
+            cache=bucket_cache,
+            buckets=PowerOfTwoBuckets(),
+        )
+        np.testing.assert_allclose(
+            bucket_result.to_numpy(),
+            scipy_softmax(bucket_input, axis=1),
+            rtol=1e-5,
+            atol=1e-7,
+        )
+    assert bucket_cache.misses == 1, bucket_cache.misses
+    print(f"Verification passed: {len(bucket_shapes)} shapes, one compiled model")
+
+    # Fused log-softmax and cross-entropy, checked against SciPy's log_softmax
+    logits = np.random.randn(BATCH, ROW_SIZE).astype(np.float32) * 10
+    targets = np.random.randint(0, ROW_SIZE, size=BATCH)
+    expected_log = scipy_log_softmax(logits, axis=1)
+    expected_loss = -expected_log[np.arange(BATCH), targets]
+    for fused_session, fused_device in (
+        (cpu_session, CPU()),
+        (gpu_session, Accelerator()),
+    ):
+        log_result = log_softmax(logits, fused_session, fused_device)
+        loss_result = softmax_cross_entropy(
+            logits, targets, fused_session, fused_device
+        )
+        np.testing.assert_allclose(
+            log_result.to_numpy(), expected_log, rtol=1e-5, atol=1e-4
+        )
+        np.testing.assert_allclose(
+            loss_result.to_numpy(), expected_loss, rtol=1e-5, atol=1e-4
+        )
+    print("Verification passed: fused log_softmax and cross-entropy match SciPy")
+
+    # Many requests in flight at once through the asyncio pipeline, on the
+    # GPU and through the CPU thread-pool fallback
+    async def softmax_all(
+        inputs: list[NDArray[np.float32]],
+        async_session: InferenceSession,
+        async_device: Device,
+    ) -> list[Tensor]:
+        async with DevicePipeline(async_device, max_in_flight=4) as pipeline:
+            return await asyncio.gather(
+                *(softmax_async(x, async_session, pipeline) for x in inputs)
+            )
+
+    async_inputs = [np.random.randn(4096).astype(np.float32) for _ in range(16)]
+    for async_session, async_device in (
+        (cpu_session, CPU()),
+        (gpu_session, Accelerator()),
+    ):
+        async_results = asyncio.run(
+            softmax_all(async_inputs, async_session, async_device)
+        )
+        for x, async_result in zip(async_inputs, async_results):
+            np.testing.assert_allclose(
+                async_result.to_numpy(), scipy_softmax(x), rtol=1e-5, atol=1e-7
+            )
+    print(f"Verification passed: {len(async_inputs)} async softmax requests")
@@ -1,4 +1,8 @@
+import asyncio
+import sys
+import time
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 from max.driver import CPU, Accelerator, Device, Tensor
@@ -7,53 +11,111 @@ from max.engine import InferenceSession
 from max.graph import DeviceRef, Graph, TensorType, ops
 from numpy.typing import NDArray
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.async_pipeline import DevicePipeline  # noqa: E402
+from common.dtypes import (  # noqa: E402
+    TOLERANCES,
+    check_dtype,
+    round_to_dtype,
+    to_numpy,
+    to_tensor,
+)
+from common.model_cache import (  # noqa: E402
+    DiskModelCache,
+    ModelCache,
+    device_key,
+)
+from common.op_package import ensure_op_package, hash_op_package  # noqa: E402
+from common.shape_buckets import (  # noqa: E402
+    BucketPolicy,
+    PowerOfTwoBuckets,
+    bucket_size,
+    pad_to,
+)
+from common.transfers import (  # noqa: E402
+    TRANSFERS,
+    ArrayOrTensor,
+    TransferStats,
+    finish,
+    move,
+    require_arrays,
+    reshape,
+    to_device,
+    to_host,
+)
+from p15.p15 import conv_1d, reference_conv_1d  # noqa: E402
+from p16.p16 import softmax  # noqa: E402
 
-def attention(
-    q: NDArray[np.float32],
-    k: NDArray[np.float32],
-    v: NDArray[np.float32],
-    session: InferenceSession,
-    device: Device,
-) -> Tensor:
-    """
-    Compute vector attention: Attention(Q, K, V) = softmax(Q · K^T) @ V
+MODEL_CACHE = ModelCache(disk_cache=DiskModelCache.from_env())
+# Custom-op packages of the conv1d (p15), softmax (p16) and attention ops,
+# with the distinct names they are packaged under when loaded together
+SOLUTIONS = Path(__file__).resolve().parent.parent
+OP_PACKAGES = {
+    "conv1d_op": SOLUTIONS / "p15" / "op",
+    "softmax_op": SOLUTIONS / "p16" / "op",
+    "attention_op": SOLUTIONS / "p17" / "op",
+}
+# The puzzle op runs its softmax in a single block of TPB = SEQ_LEN threads
+SINGLE_BLOCK_MAX_SEQ_LEN = 16
+# Threads per block of the fused kernels (FLASH_TPB in op/attention.mojo)
+FLASH_TPB = 64
+# Static shared memory a kernel can use on every supported GPU
+STATIC_SHARED_MEMORY_BYTES = 48 * 1024
 
-    Args:
-        q: Query vector of shape (d,)
-        k: Key matrix of shape (seq_len, d)
-        v: Value matrix of shape (seq_len, d)
-        session: MAX inference session
-        device: Target device (CPU or GPU)
 
-    Returns:
-        Attention output vector of shape (d,)
+def flash_shared_memory_bytes(d: int, dtype: DType) -> int:
+    """Static shared memory `flash_attention_query` uses for head size `d`.
+
+    The query and the (FLASH_TPB, d) K and V tiles are in `dtype`; the output
+    accumulator and two FLASH_TPB reduction buffers are float32.
     """
-    dtype = DType.float32
-    seq_len, d = k.shape
+    tiles = (2 * FLASH_TPB + 1) * d * dtype.size_in_bytes
+    return tiles + (d + 2 * FLASH_TPB) * 4
 
-    # Convert inputs to tensors
-    q_tensor = Tensor.from_numpy(q).to(device)
-    k_tensor = Tensor.from_numpy(k).to(device)
-    v_tensor = Tensor.from_numpy(v).to(device)
 
-    mojo_kernels = Path(__file__).parent / "op"
+def flash_fits(d: int, dtype: DType, device: Device) -> bool:
+    """Whether the fused kernels can launch with head size `d` on `device`."""
+    if device == CPU():
+        return True
+    return flash_shared_memory_bytes(d, dtype) <= STATIC_SHARED_MEMORY_BYTES
+
+
+def check_flash_head_dim(d: int, dtype: DType, device: Device) -> None:
+    if not flash_fits(d, dtype, device):
+        raise ValueError(
+            f"head size {d} needs {flash_shared_memory_bytes(d, dtype)} bytes "
+            f"of shared memory in the fused {dtype} attention kernels, more "
+            f"than the {STATIC_SHARED_MEMORY_BYTES} available on the GPU; use "
+            "attention_batched() or a smaller head size"
+        )
+
+
+def build_attention_graph(
+    q_shape: tuple[int, ...],
+    k_shape: tuple[int, ...],
+    v_shape: tuple[int, ...],
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
+    seq_len, d = k_shape
 
     with Graph(
         "attention_graph",
         input_types=[
             TensorType(
                 dtype,
-                shape=q_tensor.shape,
+                shape=q_shape,
                 device=DeviceRef.from_device(device),
             ),
             TensorType(
                 dtype,
-                shape=k_tensor.shape,
+                shape=k_shape,
                 device=DeviceRef.from_device(device),
             ),
             TensorType(
                 dtype,
-                shape=v_tensor.shape,
+                shape=v_shape,
                 device=DeviceRef.from_device(device),
             ),
         ],
@@ -82,21 +144,896 @@ def attention(
         graph.output(output)
 
     print(f"Compiling attention graph on {device}")
-    model = session.load(graph)
+    return graph
+
+
+def attention(
+    q: ArrayOrTensor,
+    k: ArrayOrTensor,
+    v: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+    buckets: Optional[BucketPolicy] = None,
+) -> Tensor:
+    """
+    Compute vector attention: Attention(Q, K, V) = softmax(Q · K^T) @ V
+
+    Args:
+        q: Query vector of shape (d,)
+        k: Key matrix of shape (seq_len, d)
+        v: Value matrix of shape (seq_len, d)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        cache: Compiled model cache, shared by all calls by default
+        dtype: Element type on the device (float32, float16 or bfloat16)
+        buckets: Optional policy rounding seq_len up so one compiled model
+            serves every length in a bucket (see common/shape_buckets.py)
+
+    Returns:
+        Attention output vector of shape (d,)
+
+    Sequences longer than the puzzle op's single block, and 16-bit inputs,
+    go through the fused `attention_flash()` kernel, which accumulates the
+    scores, softmax and output in float32. float32 head sizes too large for
+    its shared-memory tiles use `attention_batched()` instead. With
+    `buckets`, K and V are padded and the real seq_len is passed to
+    `attention_ragged()` as an offset, so padded keys are never attended to.
+
+    NumPy inputs are uploaded and the result returned on the host. If `q`
+    is a `Tensor` the inputs are used in place (`k` and `v` may be Tensors
+    already on `device` too) and the result is left on `device`.
+    """
+    check_dtype(dtype)
+    if buckets is not None:
+        require_arrays(q, k, v, reason="padding to a bucket")
+        result = attention_ragged(
+            q[np.newaxis],
+            k,
+            v,
+            np.array([0, 1], dtype=np.int32),
+            np.array([0, k.shape[0]], dtype=np.int32),
+            session,
+            device,
+            cache=cache,
+            dtype=dtype,
+            buckets=buckets,
+        )
+        return to_tensor(to_numpy(result)[0], dtype)
+    if k.shape[0] > SINGLE_BLOCK_MAX_SEQ_LEN or dtype != DType.float32:
+        d = q.shape[0]
+        if dtype == DType.float32 and not flash_fits(d, dtype, device):
+            result = attention_batched(
+                reshape(q, (1, d)), k, v, session, device, cache
+            )
+        else:
+            result = attention_flash(
+                reshape(q, (1, d)), k, v, session, device, cache, dtype=dtype
+            )
+        return reshape(result, (d,))
+
+    # Convert inputs to tensors
+    on_device = isinstance(q, Tensor)
+    q_tensor = to_device(q, dtype, device)
+    k_tensor = to_device(k, dtype, device)
+    v_tensor = to_device(v, dtype, device)
+
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+    shapes = (
+        tuple(q_tensor.shape),
+        tuple(k_tensor.shape),
+        tuple(v_tensor.shape),
+    )
+    key = (
+        "attention",
+        *shapes,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_attention_graph(*shapes, dtype, device, mojo_kernels),
+        custom_extensions=[mojo_kernels],
+    )
     print(f"Executing attention on {device}")
     print("="*100)
     result = model.execute(q_tensor, k_tensor, v_tensor)[0]
     assert isinstance(result, Tensor)
+    return finish(result, on_device)
+
+
+async def attention_async(
+    q: ArrayOrTensor,
+    k: ArrayOrTensor,
+    v: ArrayOrTensor,
+    session: InferenceSession,
+    pipeline: DevicePipeline,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+) -> Tensor:
+    """
+    Awaitable `attention()` on `pipeline.device`, with the result on the host.
+
+    Concurrent calls through one pipeline overlap their uploads, executions
+    and downloads (see common/async_pipeline.py).
+    """
+    return await pipeline.run(
+        lambda q, k, v: attention(
+            q, k, v, session, pipeline.device, cache, dtype=dtype
+        ),
+        [q, k, v],
+        dtype,
+    )
+
+
+def build_attention_batched_graph(
+    op_name: str,
+    q_shape: tuple[int, ...],
+    k_shape: tuple[int, ...],
+    v_shape: tuple[int, ...],
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
+    num_queries, d = q_shape
+    seq_len = k_shape[0]
+
+    with Graph(
+        f"{op_name}_graph",
+        input_types=[
+            TensorType(dtype, shape=shape, device=DeviceRef.from_device(device))
+            for shape in (q_shape, k_shape, v_shape)
+        ],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        output = ops.custom(
+            name=op_name,
+            values=list(graph.inputs),
+            out_types=[
+                TensorType(
+                    dtype=dtype,
+                    shape=(num_queries, d),
+                    device=DeviceRef.from_device(device),
+                )
+            ],
+            parameters={
+                "num_queries": num_queries,
+                "seq_len": seq_len,
+                "d": d,
+                "dtype": dtype,
+            },
+        )[0].tensor
+        graph.output(output)
+
+    print(f"Compiling {op_name} graph on {device}")
+    return graph
+
+
+def attention_batched(
+    q: ArrayOrTensor,
+    k: ArrayOrTensor,
+    v: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+) -> Tensor:
+    """
+    Attend many queries to the same keys and values in one execution.
+
+    K and V are uploaded once and Q @ K^T is computed as a single tiled
+    matmul instead of one `attention()` call per query.
+
+    Args:
+        q: Query matrix of shape (num_queries, d)
+        k: Key matrix of shape (seq_len, d)
+        v: Value matrix of shape (seq_len, d)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        cache: Compiled model cache, shared by all calls by default
+
+    Returns:
+        Attention output of shape (num_queries, d)
+    """
+    return _attention_2d(
+        "attention_batched", q, k, v, session, device, cache, DType.float32
+    )
+
+
+def attention_flash(
+    q: ArrayOrTensor,
+    k: ArrayOrTensor,
+    v: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+) -> Tensor:
+    """
+    Same as `attention_batched()`, computed by a single fused kernel.
+
+    K and V are streamed through shared memory with an online softmax, so the
+    (num_queries, seq_len) scores never reach device memory and seq_len is
+    not limited by the block size. `dtype` may be float32, float16 or
+    bfloat16; accumulation is always float32. On a GPU the K and V tiles
+    must fit in static shared memory, which bounds d (see `flash_fits()`).
+    """
+    check_dtype(dtype)
+    return _attention_2d(
+        "attention_flash", q, k, v, session, device, cache, dtype
+    )
+
+
+def _attention_2d(
+    op_name: str,
+    q: ArrayOrTensor,
+    k: ArrayOrTensor,
+    v: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache,
+    dtype: DType,
+) -> Tensor:
+    if len(q.shape) != 2 or len(k.shape) != 2 or len(v.shape) != 2:
+        raise ValueError(
+            f"expected 2D q, k and v, got shapes {q.shape}, {k.shape}, {v.shape}"
+        )
+    if k.shape != v.shape or q.shape[1] != k.shape[1]:
+        raise ValueError(
+            f"q {q.shape} must be (num_queries, d) and k {k.shape}, "
+            f"v {v.shape} both (seq_len, d)"
+        )
+    if op_name == "attention_flash":
+        check_flash_head_dim(q.shape[1], dtype, device)
+
+    on_device = isinstance(q, Tensor)
+    q_tensor = to_device(q, dtype, device)
+    k_tensor = to_device(k, dtype, device)
+    v_tensor = to_device(v, dtype, device)
+
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+    shapes = (tuple(q.shape), tuple(k.shape), tuple(v.shape))
+    key = (
+        op_name,
+        *shapes,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_attention_batched_graph(
+            op_name, *shapes, dtype, device, mojo_kernels
+        ),
+        custom_extensions=[mojo_kernels],
+    )
+    print(f"Executing {op_name} on {device}")
+    result = model.execute(q_tensor, k_tensor, v_tensor)[0]
+    assert isinstance(result, Tensor)
+    return finish(result, on_device)
+
+
+def build_attention_multihead_graph(
+    q_shape: tuple[int, ...],
+    kv_shape: tuple[int, ...],
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
+    heads, q_len, head_dim = q_shape
+    seq_len = kv_shape[1]
+    device_ref = DeviceRef.from_device(device)
+
+    with Graph(
+        "attention_multihead_graph",
+        input_types=[
+            TensorType(dtype, shape=q_shape, device=device_ref),
+            TensorType(dtype, shape=kv_shape, device=device_ref),
+            TensorType(dtype, shape=kv_shape, device=device_ref),
+        ],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        output = ops.custom(
+            name="attention_multihead",
+            values=list(graph.inputs),
+            out_types=[TensorType(dtype=dtype, shape=q_shape, device=device_ref)],
+            parameters={
+                "heads": heads,
+                "q_len": q_len,
+                "seq_len": seq_len,
+                "head_dim": head_dim,
+                "dtype": dtype,
+            },
+        )[0].tensor
+        graph.output(output)
+
+    print(f"Compiling attention_multihead graph on {device}")
+    return graph
+
+
+def attention_multihead(
+    q: NDArray[np.float32],
+    k: NDArray[np.float32],
+    v: NDArray[np.float32],
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+) -> Tensor:
+    """
+    Multi-head attention with every head computed in one kernel launch.
+
+    Each head attends its own queries to its own keys and values; heads are
+    spread over the grid's y dimension and queries over x.
+
+    Args:
+        q: Queries of shape (heads, q_len, head_dim)
+        k: Keys of shape (heads, seq_len, head_dim)
+        v: Values of shape (heads, seq_len, head_dim)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        cache: Compiled model cache, shared by all calls by default
+
+    Returns:
+        Attention output of shape (heads, q_len, head_dim)
+    """
+    if q.ndim != 3 or k.shape != v.shape or k.ndim != 3:
+        raise ValueError(
+            f"expected 3D q and equal 3D k, v, got {q.shape}, {k.shape}, {v.shape}"
+        )
+    if q.shape[0] != k.shape[0] or q.shape[2] != k.shape[2]:
+        raise ValueError(
+            f"q {q.shape} and k/v {k.shape} must agree on heads and head_dim"
+        )
+    dtype = DType.float32
+    check_flash_head_dim(q.shape[2], dtype, device)
+
+    q_tensor = Tensor.from_numpy(np.ascontiguousarray(q)).to(device)
+    k_tensor = Tensor.from_numpy(np.ascontiguousarray(k)).to(device)
+    v_tensor = Tensor.from_numpy(np.ascontiguousarray(v)).to(device)
+
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+    shapes = (tuple(q.shape), tuple(k.shape))
+    key = (
+        "attention_multihead",
+        *shapes,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_attention_multihead_graph(
+            *shapes, dtype, device, mojo_kernels
+        ),
+        custom_extensions=[mojo_kernels],
+    )
+    print(f"Executing attention_multihead on {device}")
+    result = model.execute(q_tensor, k_tensor, v_tensor)[0]
+    assert isinstance(result, Tensor)
     return result.to(CPU()) if device == Accelerator() else result
 
 
-def reference_attention(q: NDArray[np.float32], k: NDArray[np.float32], v: NDArray[np.float32]) -> NDArray[np.float32]:
-    """Reference implementation of vector attention using NumPy."""
-    scores = np.dot(k, q)
-    scores_max = np.max(scores)
+def pack_sequences(
+    sequences: list[NDArray[np.float32]],
+) -> tuple[NDArray[np.float32], NDArray[np.int32]]:
+    """Concatenate (len_i, d) arrays and return them with their offsets.
+
+    Sequence i occupies rows offsets[i]:offsets[i + 1] of the packed array.
+    """
+    lengths = [len(seq) for seq in sequences]
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    return np.concatenate(sequences).astype(np.float32, copy=False), offsets
+
+
+def build_attention_ragged_graph(
+    q_shape: tuple[int, ...],
+    kv_shape: tuple[int, ...],
+    batch: int,
+    max_q_len: int,
+    causal: bool,
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
+    total_q, d = q_shape
+    device_ref = DeviceRef.from_device(device)
+
+    with Graph(
+        "attention_ragged_graph",
+        input_types=[
+            TensorType(dtype, shape=q_shape, device=device_ref),
+            TensorType(dtype, shape=kv_shape, device=device_ref),
+            TensorType(dtype, shape=kv_shape, device=device_ref),
+            TensorType(DType.int32, shape=(batch + 1,), device=device_ref),
+            TensorType(DType.int32, shape=(batch + 1,), device=device_ref),
+        ],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        output = ops.custom(
+            name="attention_ragged",
+            values=list(graph.inputs),
+            out_types=[TensorType(dtype=dtype, shape=q_shape, device=device_ref)],
+            parameters={
+                "batch": batch,
+                "total_q": total_q,
+                "total_kv": kv_shape[0],
+                "max_q_len": max_q_len,
+                "d": d,
+                "causal": causal,
+                "dtype": dtype,
+            },
+        )[0].tensor
+        graph.output(output)
+
+    print(f"Compiling attention_ragged graph on {device}")
+    return graph
+
+
+def attention_ragged(
+    q: NDArray[np.float32],
+    k: NDArray[np.float32],
+    v: NDArray[np.float32],
+    q_offsets: NDArray[np.int32],
+    kv_offsets: NDArray[np.int32],
+    session: InferenceSession,
+    device: Device,
+    causal: bool = False,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+    buckets: Optional[BucketPolicy] = None,
+) -> Tensor:
+    """
+    Attention over a batch of variable-length sequences without padding.
+
+    Sequences are packed back to back (see `pack_sequences()`): sequence i
+    owns rows q_offsets[i]:q_offsets[i + 1] of `q` and
+    kv_offsets[i]:kv_offsets[i + 1] of `k` and `v`, so the offsets double as
+    the per-sequence length vector. With `causal`, keys past each query's
+    position are masked by never loading them.
+
+    Args:
+        q: Packed queries of shape (total_q, d)
+        k: Packed keys of shape (total_kv, d)
+        v: Packed values of shape (total_kv, d)
+        q_offsets: Query offsets of shape (batch + 1,), starting at 0
+        kv_offsets: Key/value offsets of shape (batch + 1,), starting at 0
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        causal: Apply a causal mask within each sequence
+        cache: Compiled model cache, shared by all calls by default
+        dtype: Element type on the device; accumulation is float32
+        buckets: Optional policy rounding the batch, packed row counts and
+            longest query count up, so one compiled model serves a range of
+            batches; the offsets keep the padding out of every sequence
+
+    Returns:
+        Packed attention output of shape (total_q, d)
+    """
+    q_offsets = np.asarray(q_offsets, dtype=np.int32)
+    kv_offsets = np.asarray(kv_offsets, dtype=np.int32)
+    if q.ndim != 2 or k.shape != v.shape or k.ndim != 2 or q.shape[1] != k.shape[1]:
+        raise ValueError(
+            f"q {q.shape} must be (total_q, d) and k {k.shape}, v {v.shape} "
+            "both (total_kv, d)"
+        )
+    if q_offsets.shape != kv_offsets.shape or q_offsets.shape[0] < 2:
+        raise ValueError("q_offsets and kv_offsets must both be (batch + 1,)")
+    q_lengths = np.diff(q_offsets)
+    kv_lengths = np.diff(kv_offsets)
+    if (
+        q_offsets[0] != 0
+        or kv_offsets[0] != 0
+        or q_offsets[-1] != q.shape[0]
+        or kv_offsets[-1] != k.shape[0]
+        or (q_lengths < 0).any()
+        or (kv_lengths < 0).any()
+    ):
+        raise ValueError("offsets must increase from 0 to the packed row count")
+    # Every query needs at least one visible key
+    if ((q_lengths > 0) & (kv_lengths < (q_lengths if causal else 1))).any():
+        raise ValueError(
+            "each sequence needs at least one key per query"
+            + (" (kv_len >= q_len when causal)" if causal else "")
+        )
+    check_dtype(dtype)
+    total_q, d = q.shape
+    check_flash_head_dim(d, dtype, device)
+    batch = bucket_size(len(q_lengths), buckets)
+    max_q_len = bucket_size(max(int(q_lengths.max()), 1), buckets)
+    # Trailing empty sequences and rows no offset points into
+    q_offsets = pad_to(q_offsets, (batch + 1,), value=q_offsets[-1])
+    kv_offsets = pad_to(kv_offsets, (batch + 1,), value=kv_offsets[-1])
+    q = pad_to(q, (bucket_size(total_q, buckets), d))
+    k = pad_to(k, (bucket_size(k.shape[0], buckets), d))
+    v = pad_to(v, k.shape)
+
+    tensors = [to_tensor(array, dtype).to(device) for array in (q, k, v)] + [
+        Tensor.from_numpy(offsets).to(device)
+        for offsets in (q_offsets, kv_offsets)
+    ]
+
+    mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+    shapes = (tuple(q.shape), tuple(k.shape))
+    key = (
+        "attention_ragged",
+        *shapes,
+        batch,
+        max_q_len,
+        causal,
+        dtype,
+        device_key(device),
+        hash_op_package(mojo_kernels),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_attention_ragged_graph(
+            *shapes, batch, max_q_len, causal, dtype, device, mojo_kernels
+        ),
+        custom_extensions=[mojo_kernels],
+    )
+    print(f"Executing attention_ragged on {device}")
+    result = model.execute(*tensors)[0]
+    assert isinstance(result, Tensor)
+    if q.shape[0] != total_q:
+        return to_tensor(to_numpy(result.to(CPU()))[:total_q], dtype)
+    return result.to(CPU()) if device == Accelerator() else result
+
+
+def build_attention_decode_graph(
+    capacity: int,
+    d: int,
+    dtype: DType,
+    device: Device,
+    mojo_kernels: Path,
+) -> Graph:
+    device_ref = DeviceRef.from_device(device)
+    with Graph(
+        "attention_decode_graph",
+        input_types=[
+            TensorType(dtype, shape=(1, d), device=device_ref),
+            TensorType(dtype, shape=(capacity, d), device=device_ref),
+            TensorType(dtype, shape=(capacity, d), device=device_ref),
+            TensorType(DType.int32, shape=(1,), device=device_ref),
+        ],
+        custom_extensions=[mojo_kernels],
+    ) as graph:
+        output = ops.custom(
+            name="attention_decode",
+            values=list(graph.inputs),
+            out_types=[TensorType(dtype=dtype, shape=(1, d), device=device_ref)],
+            parameters={"capacity": capacity, "d": d, "dtype": dtype},
+        )[0].tensor
+        graph.output(output)
+
+    print(f"Compiling attention_decode graph on {device}")
+    return graph
+
+
+class AttentionSession:
+    """
+    Incremental attention over a K/V cache that lives on the device.
+
+    K and V are preallocated with room for `capacity` rows and filled in
+    place by `append()`, so a decoding step uploads one new row of each
+    instead of the whole history. `attend()` runs a single compiled model for
+    every length up to `capacity`; the current length is passed to the
+    kernel as a one-element tensor.
+
+        kv = AttentionSession(session, device, d=64, capacity=4096)
+        kv.append(prompt_k, prompt_v)
+        for q, k, v in steps:
+            out = kv.step(q, k, v)
+    """
+
+    def __init__(
+        self,
+        session: InferenceSession,
+        device: Device,
+        d: int,
+        capacity: int,
+        cache: ModelCache = MODEL_CACHE,
+    ):
+        if d < 1 or capacity < 1:
+            raise ValueError(
+                f"d and capacity must be positive, got d={d}, capacity={capacity}"
+            )
+        self.session = session
+        self.device = device
+        self.d = d
+        self.capacity = capacity
+        self.dtype = DType.float32
+        self.length = 0
+        check_flash_head_dim(d, self.dtype, device)
+
+        self._k = Tensor(shape=(capacity, d), dtype=self.dtype, device=device)
+        self._v = Tensor(shape=(capacity, d), dtype=self.dtype, device=device)
+
+        mojo_kernels = ensure_op_package(Path(__file__).parent / "op")
+        key = (
+            "attention_decode",
+            capacity,
+            d,
+            self.dtype,
+            device_key(device),
+            hash_op_package(mojo_kernels),
+        )
+        self._model = cache.get_or_load(
+            key,
+            session,
+            lambda: build_attention_decode_graph(
+                capacity, d, self.dtype, device, mojo_kernels
+            ),
+            custom_extensions=[mojo_kernels],
+        )
+
+    def append(self, k: NDArray[np.float32], v: NDArray[np.float32]) -> None:
+        """Copy new rows of shape (d,) or (n, d) into the device buffers."""
+        k = np.ascontiguousarray(np.atleast_2d(k), dtype=np.float32)
+        v = np.ascontiguousarray(np.atleast_2d(v), dtype=np.float32)
+        if k.shape != v.shape or k.shape[1] != self.d:
+            raise ValueError(
+                f"k {k.shape} and v {v.shape} must both be (n, {self.d})"
+            )
+        end = self.length + k.shape[0]
+        if end > self.capacity:
+            raise ValueError(
+                f"appending {k.shape[0]} rows to {self.length} exceeds "
+                f"capacity {self.capacity}"
+            )
+        # Row-major slices of whole rows are contiguous views of the buffers
+        self._k[self.length : end, :].inplace_copy_from(
+            to_device(k, self.dtype, self.device)
+        )
+        self._v[self.length : end, :].inplace_copy_from(
+            to_device(v, self.dtype, self.device)
+        )
+        self.length = end
+
+    def attend(self, q: NDArray[np.float32]) -> Tensor:
+        """Attention of one query (d,) over the rows appended so far."""
+        if q.shape != (self.d,):
+            raise ValueError(f"expected q of shape ({self.d},), got {q.shape}")
+        if self.length == 0:
+            raise ValueError("attend() needs at least one appended K/V row")
+        q_tensor = to_device(q.reshape(1, self.d), self.dtype, self.device)
+        length = Tensor.from_numpy(np.array([self.length], dtype=np.int32))
+        result = self._model.execute(
+            q_tensor, self._k, self._v, move(length, self.device)
+        )[0]
+        assert isinstance(result, Tensor)
+        return Tensor.from_numpy(to_host(result).to_numpy()[0])
+
+    def step(
+        self,
+        q: NDArray[np.float32],
+        k: NDArray[np.float32],
+        v: NDArray[np.float32],
+    ) -> Tensor:
+        """Append one K/V row and attend the new query to everything so far."""
+        self.append(k, v)
+        return self.attend(q)
+
+    def reset(self) -> None:
+        """Forget all rows; the buffers and compiled model are kept."""
+        self.length = 0
+
+
+def conv_softmax_attention(
+    x: NDArray[np.float32],
+    kernel: NDArray[np.float32],
+    k: NDArray[np.float32],
+    v: NDArray[np.float32],
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+) -> tuple[Tensor, TransferStats]:
+    """
+    attention(softmax(conv_1d(x, kernel)), k, v) with one upload and download.
+
+    The inputs are uploaded once, each op consumes the previous op's result
+    where it already is on `device`, and only the final (d,) output is
+    copied back. The softmax weights are the attention query, so `k` and `v`
+    are (seq_len, len(x)).
+
+    Returns:
+        The output on the host and the bytes copied between host and device
+    """
+    before = TransferStats(
+        TRANSFERS.host_to_device_bytes, TRANSFERS.device_to_host_bytes
+    )
+    x_tensor = to_device(x, DType.float32, device)
+    kernel_tensor = to_device(kernel, DType.float32, device)
+    k_tensor = to_device(k, DType.float32, device)
+    v_tensor = to_device(v, DType.float32, device)
+
+    convolved = conv_1d(x_tensor, kernel_tensor, session, device, cache)
+    weights = softmax(convolved, session, device, cache)
+    output = to_host(attention(weights, k_tensor, v_tensor, session, device, cache))
+
+    transferred = TransferStats(
+        TRANSFERS.host_to_device_bytes - before.host_to_device_bytes,
+        TRANSFERS.device_to_host_bytes - before.device_to_host_bytes,
+    )
+    return output, transferred
+
+
+def build_conv_softmax_attention_graph(
+    input_size: int,
+    conv_size: int,
+    seq_len: int,
+    dtype: DType,
+    device: Device,
+    op_packages: list[Path],
+) -> Graph:
+    """One graph running conv1d, softmax and attention back to back.
+
+    The ops come from three `op/` packages; their intermediates are graph
+    values, so the compiler can schedule them and no copies are made.
+    """
+    device_ref = DeviceRef.from_device(device)
+    row_shape = (1, input_size)
+    kv_shape = (seq_len, input_size)
+
+    with Graph(
+        "conv_softmax_attention_graph",
+        input_types=[
+            TensorType(dtype, shape=row_shape, device=device_ref),
+            TensorType(dtype, shape=(1, conv_size), device=device_ref),
+            TensorType(dtype, shape=kv_shape, device=device_ref),
+            TensorType(dtype, shape=kv_shape, device=device_ref),
+        ],
+        custom_extensions=op_packages,
+    ) as graph:
+        x_value, kernel_value, k_value, v_value = graph.inputs
+        row_type = TensorType(dtype=dtype, shape=row_shape, device=device_ref)
+
+        # The 2D variants have CPU kernels, take any size and accumulate in
+        # float32, so the whole chain runs on either device in any dtype
+        convolved = ops.custom(
+            name="conv1d_batched",
+            values=[x_value, kernel_value],
+            out_types=[row_type],
+            parameters={
+                "batch_size": 1,
+                "input_size": input_size,
+                "conv_size": conv_size,
+                "kernel_batch": 1,
+                "dtype": dtype,
+            },
+        )[0].tensor
+        weights = ops.custom(
+            name="softmax_batched",
+            values=[convolved],
+            out_types=[row_type],
+            parameters={"batch_size": 1, "row_size": input_size, "dtype": dtype},
+        )[0].tensor
+        output = ops.custom(
+            name="attention_flash",
+            values=[weights, k_value, v_value],
+            out_types=[row_type],
+            parameters={
+                "num_queries": 1,
+                "seq_len": seq_len,
+                "d": input_size,
+                "dtype": dtype,
+            },
+        )[0].tensor
+        graph.output(ops.reshape(output, (input_size,)))
+
+    print(f"Compiling conv_softmax_attention graph on {device}")
+    return graph
+
+
+def fused_op_packages() -> list[Path]:
+    """The p15-p17 op packages, built as `conv1d_op.mojopkg` and so on.
+
+    Every puzzle's sources live in a directory named `op`, so loading the
+    three into one graph under that name would make them indistinguishable.
+    Without the `mojo` CLI the `op/` directories are passed as they are.
+    """
+    return [
+        ensure_op_package(op_dir, op_dir.with_name(name + ".mojopkg"))
+        for name, op_dir in OP_PACKAGES.items()
+    ]
+
+
+def conv_softmax_attention_fused(
+    x: ArrayOrTensor,
+    kernel: ArrayOrTensor,
+    k: ArrayOrTensor,
+    v: ArrayOrTensor,
+    session: InferenceSession,
+    device: Device,
+    cache: ModelCache = MODEL_CACHE,
+    dtype: DType = DType.float32,
+) -> Tensor:
+    """
+    Same as `conv_softmax_attention()`, compiled and executed as one graph.
+
+    Args:
+        x: Signal of shape (d,)
+        kernel: Convolution kernel of shape (conv_size,)
+        k: Key matrix of shape (seq_len, d)
+        v: Value matrix of shape (seq_len, d)
+        session: MAX inference session
+        device: Target device (CPU or GPU)
+        cache: Compiled model cache, shared by all calls by default
+        dtype: Element type on the device; every op accumulates in float32
+
+    Returns:
+        Attention output of shape (d,), on the host for a NumPy `x` and on
+        `device` for a Tensor
+    """
+    check_dtype(dtype)
+    if len(x.shape) != 1 or len(kernel.shape) != 1:
+        raise ValueError(
+            f"expected 1D x and kernel, got shapes {x.shape}, {kernel.shape}"
+        )
+    if len(k.shape) != 2 or k.shape != v.shape or k.shape[1] != x.shape[0]:
+        raise ValueError(
+            f"k {k.shape} and v {v.shape} must both be (seq_len, {x.shape[0]})"
+        )
+    check_flash_head_dim(x.shape[0], dtype, device)
+    on_device = isinstance(x, Tensor)
+    input_size, conv_size = x.shape[0], kernel.shape[0]
+    seq_len = k.shape[0]
+    x_tensor = to_device(reshape(x, (1, input_size)), dtype, device)
+    kernel_tensor = to_device(reshape(kernel, (1, conv_size)), dtype, device)
+    k_tensor = to_device(k, dtype, device)
+    v_tensor = to_device(v, dtype, device)
+
+    packages = fused_op_packages()
+    key = (
+        "conv_softmax_attention",
+        input_size,
+        conv_size,
+        seq_len,
+        dtype,
+        device_key(device),
+        *(hash_op_package(package) for package in packages),
+    )
+    model = cache.get_or_load(
+        key,
+        session,
+        lambda: build_conv_softmax_attention_graph(
+            input_size, conv_size, seq_len, dtype, device, packages
+        ),
+        custom_extensions=packages,
+    )
+    print(f"Executing conv_softmax_attention on {device}")
+    result = model.execute(x_tensor, kernel_tensor, k_tensor, v_tensor)[0]
+    assert isinstance(result, Tensor)
+    return finish(result, on_device)
+
+
+def reference_attention(
+    q: NDArray[np.float32],
+    k: NDArray[np.float32],
+    v: NDArray[np.float32],
+    causal: bool = False,
+) -> NDArray[np.float32]:
+    """Reference implementation of attention using NumPy.
+
+    `q` is a single query (d,), a batch of queries (num_queries, d) or
+    multi-head queries (heads, num_queries, d) with K/V of shape
+    (heads, seq_len, d); leading axes broadcast like `np.matmul`.
+    With `causal`, query i of q_len sees keys up to i + seq_len - q_len.
+    """
+    scores = q @ np.swapaxes(k, -1, -2)
+    if causal:
+        q_len, seq_len = scores.shape[-2:]
+        visible = np.tril(np.ones((q_len, seq_len), dtype=bool), k=seq_len - q_len)
+        scores = np.where(visible, scores, -np.inf)
+    scores_max = np.max(scores, axis=-1, keepdims=True)
     scores_exp = np.exp(scores - scores_max)
-    attention_weights = scores_exp / np.sum(scores_exp)
-    output = np.dot(attention_weights, v)
+    attention_weights = scores_exp / np.sum(scores_exp, axis=-1, keepdims=True)
+    output = attention_weights @ v
     return output
 
 
@@ -268,3 +1205,344 @@ if __name__ == "__main__":
     print(f"  CPU: {np.linalg.norm(cpu_array):.6f}")
     print(f"  GPU: {np.linalg.norm(gpu_array):.6f}")
     print(f"  Expected: {np.linalg.norm(expected_result):.6f}")
+
+    print(f"\n{'='*80}")
+    print("BATCHED MULTI-QUERY ATTENTION")
+    print(f"{'='*80}")
+
+    # Sizes deliberately not multiples of the kernels' tile width
+    NUM_QUERIES, BATCHED_SEQ_LEN, BATCHED_D = 100, 75, 40
+    q_batch = np.random.randn(NUM_QUERIES, BATCHED_D).astype(np.float32) * 0.1
+    k_batch = np.random.randn(BATCHED_SEQ_LEN, BATCHED_D).astype(np.float32) * 0.1
+    v_batch = np.random.randn(BATCHED_SEQ_LEN, BATCHED_D).astype(np.float32) * 0.1
+    expected_batch = reference_attention(q_batch, k_batch, v_batch)
+
+    for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+        batch_result = attention_batched(q_batch, k_batch, v_batch, session, device)
+        np.testing.assert_allclose(
+            batch_result.to_numpy(), expected_batch, rtol=1e-4, atol=1e-4
+        )
+        print(f"✓ Batched attention on {device} PASSED ({NUM_QUERIES} queries)")
+
+    # Far more keys than dims (seq_len > d + TPB): the K transpose grid must
+    # cover every key row, not just ceil(d / TPB) tiles of them
+    TALL_SEQ_LEN, TALL_D = 200, 24
+    q_tall = np.random.randn(7, TALL_D).astype(np.float32) * 0.1
+    k_tall = np.random.randn(TALL_SEQ_LEN, TALL_D).astype(np.float32) * 0.1
+    v_tall = np.random.randn(TALL_SEQ_LEN, TALL_D).astype(np.float32) * 0.1
+    tall_result = attention_batched(
+        q_tall, k_tall, v_tall, gpu_session, Accelerator()
+    )
+    np.testing.assert_allclose(
+        tall_result.to_numpy(),
+        reference_attention(q_tall, k_tall, v_tall),
+        rtol=1e-4,
+        atol=1e-4,
+    )
+    print(f"✓ Batched attention with seq_len {TALL_SEQ_LEN} > d {TALL_D} PASSED")
+
+    print(f"\n{'='*80}")
+    print("FUSED (FLASH) ATTENTION")
+    print(f"{'='*80}")
+
+    # Far beyond the puzzle op's single block of SEQ_LEN threads
+    LONG_SEQ_LEN = 5000
+    k_long = np.random.randn(LONG_SEQ_LEN, BATCHED_D).astype(np.float32) * 0.1
+    v_long = np.random.randn(LONG_SEQ_LEN, BATCHED_D).astype(np.float32) * 0.1
+    expected_long = reference_attention(q_batch, k_long, v_long)
+
+    for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+        flash_result = attention_flash(q_batch, k_long, v_long, session, device)
+        np.testing.assert_allclose(
+            flash_result.to_numpy(), expected_long, rtol=1e-4, atol=1e-4
+        )
+        single_result = attention(q_batch[0], k_long, v_long, session, device)
+        np.testing.assert_allclose(
+            single_result.to_numpy(), expected_long[0], rtol=1e-4, atol=1e-4
+        )
+        print(f"✓ Fused attention on {device} PASSED (seq_len={LONG_SEQ_LEN})")
+
+    # A head too large for the flash kernels' shared memory: attention()
+    # falls back to the batched kernels, attention_flash() refuses it
+    WIDE_D = 128
+    q_wide, k_wide, v_wide = (
+        np.random.randn(rows, WIDE_D).astype(np.float32) * 0.1
+        for rows in (1, 64, 64)
+    )
+    assert not flash_fits(WIDE_D, DType.float32, Accelerator())
+    wide_result = attention(
+        q_wide[0], k_wide, v_wide, gpu_session, Accelerator()
+    )
+    np.testing.assert_allclose(
+        wide_result.to_numpy(),
+        reference_attention(q_wide, k_wide, v_wide)[0],
+        rtol=1e-4,
+        atol=1e-4,
+    )
+    try:
+        attention_flash(q_wide, k_wide, v_wide, gpu_session, Accelerator())
+    except ValueError as error:
+        print(f"✓ attention_flash(d={WIDE_D}) rejected: {error}")
+    else:
+        raise AssertionError("attention_flash accepted an oversized head")
+
+    print(f"\n{'='*80}")
+    print("FLOAT16 AND BFLOAT16 ATTENTION")
+    print(f"{'='*80}")
+
+    for half_dtype in (DType.float16, DType.bfloat16):
+        rtol, atol = TOLERANCES[half_dtype]
+        q_half, k_half, v_half = (
+            round_to_dtype(array, half_dtype)
+            for array in (q_batch[0], k_long, v_long)
+        )
+        expected_half = reference_attention(q_half, k_half, v_half)
+        for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+            half_result = attention(
+                q_batch[0], k_long, v_long, session, device, dtype=half_dtype
+            )
+            assert half_result.dtype == half_dtype
+            np.testing.assert_allclose(
+                to_numpy(half_result), expected_half, rtol=rtol, atol=atol
+            )
+            print(f"✓ {half_dtype} attention on {device} PASSED")
+
+    print(f"\n{'='*80}")
+    print("MULTI-HEAD ATTENTION")
+    print(f"{'='*80}")
+
+    HEADS, MH_SEQ_LEN, HEAD_DIM = 12, 197, 64
+    q_heads = np.random.randn(HEADS, MH_SEQ_LEN, HEAD_DIM).astype(np.float32) * 0.1
+    k_heads = np.random.randn(HEADS, MH_SEQ_LEN, HEAD_DIM).astype(np.float32) * 0.1
+    v_heads = np.random.randn(HEADS, MH_SEQ_LEN, HEAD_DIM).astype(np.float32) * 0.1
+    expected_heads = reference_attention(q_heads, k_heads, v_heads)
+    # The vectorized reference must agree with a loop over heads
+    np.testing.assert_allclose(
+        expected_heads,
+        np.stack(
+            [reference_attention(q_heads[h], k_heads[h], v_heads[h]) for h in range(HEADS)]
+        ),
+        rtol=1e-6,
+        atol=1e-7,
+    )
+
+    for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+        heads_result = attention_multihead(q_heads, k_heads, v_heads, session, device)
+        np.testing.assert_allclose(
+            heads_result.to_numpy(), expected_heads, rtol=1e-4, atol=1e-4
+        )
+        print(f"✓ Multi-head attention on {device} PASSED ({HEADS} heads)")
+
+    print(f"\n{'='*80}")
+    print("RAGGED BATCHES AND CAUSAL MASKING")
+    print(f"{'='*80}")
+
+    RAGGED_D = 32
+    q_lens = [1, 37, 200, 64, 129]
+    # Some sequences attend to a cached prefix longer than their queries
+    kv_lens = [1, 37, 260, 64, 300]
+    q_seqs = [np.random.randn(n, RAGGED_D).astype(np.float32) * 0.1 for n in q_lens]
+    k_seqs = [np.random.randn(n, RAGGED_D).astype(np.float32) * 0.1 for n in kv_lens]
+    v_seqs = [np.random.randn(n, RAGGED_D).astype(np.float32) * 0.1 for n in kv_lens]
+    q_packed, q_offsets = pack_sequences(q_seqs)
+    k_packed, kv_offsets = pack_sequences(k_seqs)
+    v_packed, _ = pack_sequences(v_seqs)
+
+    for causal in (False, True):
+        expected_ragged = np.concatenate(
+            [
+                reference_attention(q_seq, k_seq, v_seq, causal=causal)
+                for q_seq, k_seq, v_seq in zip(q_seqs, k_seqs, v_seqs)
+            ]
+        )
+        for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+            ragged_result = attention_ragged(
+                q_packed,
+                k_packed,
+                v_packed,
+                q_offsets,
+                kv_offsets,
+                session,
+                device,
+                causal=causal,
+            )
+            np.testing.assert_allclose(
+                ragged_result.to_numpy(), expected_ragged, rtol=1e-4, atol=1e-4
+            )
+            print(f"✓ Ragged attention (causal={causal}) on {device} PASSED")
+
+    print(f"\n{'='*80}")
+    print("BUCKETED SEQUENCE LENGTHS")
+    print(f"{'='*80}")
+
+    bucket_cache = ModelCache()
+    bucket_seq_lens = [300, 400, 450, 512]
+    for bucket_seq_len in bucket_seq_lens:
+        k_bucket = k_long[:bucket_seq_len]
+        v_bucket = v_long[:bucket_seq_len]
+        bucket_result = attention(
+            q_batch[0],
+            k_bucket,
+            v_bucket,
+            gpu_session,
+            Accelerator(),
+            cache=bucket_cache,
+            buckets=PowerOfTwoBuckets(),
+        )
+        np.testing.assert_allclose(
+            bucket_result.to_numpy(),
+            reference_attention(q_batch[0], k_bucket, v_bucket),
+            rtol=1e-4,
+            atol=1e-4,
+        )
+    assert bucket_cache.misses == 1, bucket_cache.misses
+    print(f"✓ {len(bucket_seq_lens)} sequence lengths, one compiled model")
+
+    print(f"\n{'='*80}")
+    print("INCREMENTAL DECODING WITH A DEVICE-RESIDENT K/V CACHE")
+    print(f"{'='*80}")
+
+    DECODE_D, DECODE_STEPS = 64, 2048
+    k_steps = np.random.randn(DECODE_STEPS, DECODE_D).astype(np.float32) * 0.1
+    v_steps = np.random.randn(DECODE_STEPS, DECODE_D).astype(np.float32) * 0.1
+    q_steps = np.random.randn(DECODE_STEPS, DECODE_D).astype(np.float32) * 0.1
+
+    for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+        kv = AttentionSession(session, device, DECODE_D, capacity=DECODE_STEPS)
+        step_seconds = []
+        step_transfers = set()
+        for step in range(DECODE_STEPS):
+            before = (
+                TRANSFERS.host_to_device_bytes,
+                TRANSFERS.device_to_host_bytes,
+            )
+            start = time.perf_counter()
+            step_result = kv.step(q_steps[step], k_steps[step], v_steps[step])
+            step_seconds.append(time.perf_counter() - start)
+            step_transfers.add(
+                (
+                    TRANSFERS.host_to_device_bytes - before[0],
+                    TRANSFERS.device_to_host_bytes - before[1],
+                )
+            )
+            if step % 511 == 0:
+                np.testing.assert_allclose(
+                    step_result.to_numpy(),
+                    reference_attention(
+                        q_steps[step], k_steps[: step + 1], v_steps[: step + 1]
+                    ),
+                    rtol=1e-4,
+                    atol=1e-4,
+                )
+
+        # Every step copies the same bytes whatever seq_len is: the new K and
+        # V rows, the query and the length up, one output row down. The cache
+        # itself never moves, so only the attention work grows with seq_len.
+        row_bytes = DECODE_D * DType.float32.size_in_bytes
+        expected_transfers = (
+            {(3 * row_bytes + 4, row_bytes)} if device != CPU() else {(0, 0)}
+        )
+        assert step_transfers == expected_transfers, step_transfers
+        # Wall-clock times depend on the machine and its load; reported only
+        early = float(np.median(step_seconds[64:128]))
+        late = float(np.median(step_seconds[-64:]))
+        print(
+            f"{device}: median step {early * 1e3:.3f} ms early, "
+            f"{late * 1e3:.3f} ms at seq_len {DECODE_STEPS}"
+        )
+        print(f"✓ AttentionSession on {device} PASSED")
+
+    print(f"\n{'='*80}")
+    print("CONV_1D -> SOFTMAX -> ATTENTION PIPELINE")
+    print(f"{'='*80}")
+
+    # The query dim is the signal length; the flash kernel tiles K and V
+    # (FLASH_TPB, d) in shared memory, which bounds it
+    PIPELINE_SIZE, PIPELINE_CONV, PIPELINE_SEQ_LEN = 64, 5, 128
+    x_pipeline = np.random.randn(PIPELINE_SIZE).astype(np.float32)
+    kernel_pipeline = np.random.randn(PIPELINE_CONV).astype(np.float32)
+    k_pipeline = np.random.randn(PIPELINE_SEQ_LEN, PIPELINE_SIZE).astype(np.float32)
+    v_pipeline = np.random.randn(PIPELINE_SEQ_LEN, PIPELINE_SIZE).astype(np.float32)
+
+    convolved = reference_conv_1d(x_pipeline, kernel_pipeline)
+    weights = np.exp(convolved - convolved.max())
+    weights /= weights.sum()
+    expected_pipeline = reference_attention(weights, k_pipeline, v_pipeline)
+
+    # Inputs in, one output out; intermediates never leave the device
+    edge_bytes = 4 * (
+        PIPELINE_SIZE + PIPELINE_CONV + 2 * PIPELINE_SEQ_LEN * PIPELINE_SIZE
+    )
+    for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+        pipeline_result, transferred = conv_softmax_attention(
+            x_pipeline, kernel_pipeline, k_pipeline, v_pipeline, session, device
+        )
+        np.testing.assert_allclose(
+            pipeline_result.to_numpy(), expected_pipeline, rtol=1e-4, atol=1e-4
+        )
+        print(
+            f"{device}: {transferred.host_to_device_bytes} bytes uploaded, "
+            f"{transferred.device_to_host_bytes} bytes downloaded"
+        )
+        if device == Accelerator():
+            assert transferred.host_to_device_bytes == edge_bytes
+            assert transferred.device_to_host_bytes == 4 * PIPELINE_SIZE
+        else:
+            assert transferred.total_bytes == 0
+        print(f"✓ Pipeline on {device} PASSED")
+
+    print(f"\n{'='*80}")
+    print("FUSED CONV_1D + SOFTMAX + ATTENTION GRAPH")
+    print(f"{'='*80}")
+
+    fused_cache = ModelCache()
+    for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+        for _ in range(3):
+            fused_result = conv_softmax_attention_fused(
+                x_pipeline,
+                kernel_pipeline,
+                k_pipeline,
+                v_pipeline,
+                session,
+                device,
+                cache=fused_cache,
+            )
+            np.testing.assert_allclose(
+                fused_result.to_numpy(), expected_pipeline, rtol=1e-4, atol=1e-4
+            )
+        print(f"✓ Fused graph on {device} PASSED")
+    # One compile per device for all three ops
+    assert fused_cache.misses == 2, fused_cache.misses
+    fused_packages = fused_op_packages()
+    if all(package.suffix == ".mojopkg" for package in fused_packages):
+        assert [package.stem for package in fused_packages] == list(OP_PACKAGES)
+    print(f"✓ Fused graph packages: {[p.name for p in fused_packages]}")
+
+    print(f"\n{'='*80}")
+    print("ASYNC PIPELINED REQUESTS")
+    print(f"{'='*80}")
+
+    async def attend_all(
+        queries: list[NDArray[np.float32]],
+        async_session: InferenceSession,
+        async_device: Device,
+    ) -> list[Tensor]:
+        async with DevicePipeline(async_device, max_in_flight=4) as pipeline:
+            return await asyncio.gather(
+                *(
+                    attention_async(query, k_long, v_long, async_session, pipeline)
+                    for query in queries
+                )
+            )
+
+    async_queries = list(q_batch[:16])
+    for session, device in [(cpu_session, CPU()), (gpu_session, Accelerator())]:
+        async_results = asyncio.run(attend_all(async_queries, session, device))
+        for query, async_result in zip(async_queries, async_results):
+            np.testing.assert_allclose(
+                async_result.to_numpy(),
+                reference_attention(query, k_long, v_long),
+                rtol=1e-4,
+                atol=1e-4,
+            )
+        print(f"✓ {len(async_queries)} async requests on {device} PASSED")
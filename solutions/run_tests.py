@@ -0,0 +1,471 @@
+"""
+Run every solution in parallel and fail if any of them fails.
+
+Targets are found the same way as the original serial loop in run.sh. In
+each `p*/` directory:
+
+- every `.mojo` file except `__init__.mojo` runs once per
+  `argv()[1] == "--flag"` it checks for, or once without arguments;
+- every `.py` file runs the same way with its `sys.argv[1] == "--flag"`
+  checks;
+- a `test/` or `tests/` directory runs with `mojo test .`.
+
+Targets run from their puzzle directory, at most `--jobs` at a time. Each
+target's output is captured and printed in one block when it finishes, so
+concurrent targets never interleave.
+
+Mojo files are built with `mojo build` and the binary run, so their compile
+time is reported separately. Every run writes `test-reports/results.json`
+and a JUnit XML `test-reports/junit.xml` with, per target, the outcome, wall
+time, compile time (Mojo files only), peak resident memory of the target's
+processes, and its stdout and stderr.
+
+Passing targets are recorded in `.test-results.json` under a hash of
+everything they run: the file, its flag, the puzzle's `op/` package, the
+shared `common/` modules and puzzles a Python driver imports, and the
+toolchain versions. A target whose hash is unchanged since it last passed
+is skipped; `--force` runs everything. Usage:
+
+    python solutions/run_tests.py [--jobs N] [--force] [--report-dir DIR]
+        [puzzle ...]
+"""
+
+import argparse
+import functools
+import hashlib
+import importlib.metadata
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+SOLUTIONS = Path(__file__).resolve().parent
+RESULTS_FILE = SOLUTIONS / ".test-results.json"
+REPORT_DIR = SOLUTIONS / "test-reports"
+
+MOJO_FLAG = re.compile(r'argv\(\)\[1\] == "(--[^"]*)"')
+PYTHON_FLAG = re.compile(r'sys\.argv\[1\] == "(--[^"]*)"')
+# Drivers import other puzzles' drivers as e.g. `from p15.p15 import ...`
+IMPORTED_PUZZLE = re.compile(r"^from (p\d+)\.", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Target:
+    """One command to run: a file with an optional flag, or a test directory."""
+
+    kind: str  # "mojo", "python" or "mojo-test"
+    path: Path
+    flag: Optional[str] = None
+
+    @property
+    def cwd(self) -> Path:
+        return self.path if self.kind == "mojo-test" else self.path.parent
+
+    @property
+    def name(self) -> str:
+        name = self.path.relative_to(SOLUTIONS).as_posix()
+        return f"{name} {self.flag}" if self.flag else name
+
+    @property
+    def args(self) -> list[str]:
+        return [self.flag] if self.flag else []
+
+
+@dataclass
+class Process:
+    """A finished subprocess."""
+
+    returncode: int
+    stdout: str
+    stderr: str
+    seconds: float
+    peak_rss_bytes: Optional[int]
+
+
+@dataclass
+class Result:
+    target: Target
+    returncode: int
+    stdout: str
+    stderr: str
+    seconds: float
+    # Time spent in `mojo build`, for Mojo files
+    compile_seconds: Optional[float] = None
+    # Largest resident set of any of the target's processes
+    peak_rss_bytes: Optional[int] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.returncode == 0
+
+
+def _file_targets(
+    path: Path, kind: str, flag_pattern: re.Pattern
+) -> list[Target]:
+    # dict.fromkeys keeps the first occurrence of each flag, in file order
+    flags = dict.fromkeys(flag_pattern.findall(path.read_text()))
+    if not flags:
+        return [Target(kind, path)]
+    return [Target(kind, path, flag) for flag in flags]
+
+
+def discover(puzzles: Optional[list[str]] = None) -> list[Target]:
+    """Targets of every `p*/` directory, or only of the named `puzzles`."""
+    targets = []
+    for puzzle_dir in sorted(SOLUTIONS.glob("p*/")):
+        if not puzzle_dir.is_dir():
+            continue
+        if puzzles and puzzle_dir.name not in puzzles:
+            continue
+        for path in sorted(puzzle_dir.glob("*.mojo")):
+            if path.name != "__init__.mojo":
+                targets += _file_targets(path, "mojo", MOJO_FLAG)
+        for path in sorted(puzzle_dir.glob("*.py")):
+            targets += _file_targets(path, "python", PYTHON_FLAG)
+        if (puzzle_dir / "test").is_dir() or (puzzle_dir / "tests").is_dir():
+            targets.append(Target("mojo-test", puzzle_dir))
+    return targets
+
+
+@functools.cache
+def toolchain_version() -> str:
+    """Python, Mojo and MAX versions; a new one invalidates every result."""
+    try:
+        mojo = subprocess.run(
+            ["mojo", "--version"], capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        mojo = "unknown"
+    try:
+        max_version = importlib.metadata.version("max")
+    except importlib.metadata.PackageNotFoundError:
+        max_version = "unknown"
+    return f"{sys.version}\n{mojo}\nmax {max_version}"
+
+
+def _puzzle_sources(puzzle_dir: Path, seen: set[Path]) -> list[Path]:
+    """Python and `op/` sources of a puzzle and of the puzzles it imports."""
+    if puzzle_dir in seen:
+        return []
+    seen.add(puzzle_dir)
+    sources = sorted(puzzle_dir.glob("*.py"))
+    sources += sorted((puzzle_dir / "op").rglob("*.mojo"))
+    for path in sorted(puzzle_dir.glob("*.py")):
+        for puzzle in IMPORTED_PUZZLE.findall(path.read_text()):
+            sources += _puzzle_sources(SOLUTIONS / puzzle, seen)
+    return sources
+
+
+def sources(target: Target) -> list[Path]:
+    """Every file whose contents can change the outcome of `target`."""
+    if target.kind == "mojo-test":
+        return sorted(target.path.rglob("*.mojo"))
+    if target.kind == "mojo":
+        return [target.path] + sorted((target.cwd / "op").rglob("*.mojo"))
+    return _puzzle_sources(target.cwd, set()) + sorted(
+        (SOLUTIONS / "common").glob("*.py")
+    )
+
+
+def target_hash(target: Target) -> str:
+    digest = hashlib.sha256()
+    for part in (target.kind, target.flag or "", toolchain_version()):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    for path in dict.fromkeys(sources(target)):
+        digest.update(path.relative_to(SOLUTIONS).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_results(path: Path = RESULTS_FILE) -> dict[str, str]:
+    """Hash each target last passed with, by target name."""
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_results(results: dict[str, str], path: Path = RESULTS_FILE) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp_path, path)
+
+
+def run_process(command: list[str], cwd: Path) -> Process:
+    """Run `command` to completion, measuring its time and peak memory."""
+    start = time.perf_counter()
+    try:
+        process = subprocess.Popen(
+            command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError as error:
+        # e.g. `mojo` is not on PATH
+        return Process(127, "", f"{error}\n", time.perf_counter() - start, None)
+
+    # Drain both pipes before reaping, or a child filling one of them blocks
+    with ThreadPoolExecutor(max_workers=2) as readers:
+        stdout = readers.submit(process.stdout.read)
+        stderr = readers.submit(process.stderr.read)
+        stdout, stderr = stdout.result(), stderr.result()
+    # wait4 rather than Popen.wait: it also returns the child's resource usage
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    process.stdout.close()
+    process.stderr.close()
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    scale = 1 if sys.platform == "darwin" else 1024
+    return Process(
+        process.returncode,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+        time.perf_counter() - start,
+        usage.ru_maxrss * scale,
+    )
+
+
+def run_target(target: Target) -> Result:
+    """Run `target` to completion, building Mojo files first."""
+    if target.kind == "mojo-test":
+        process = run_process(["mojo", "test", "."], target.cwd)
+    elif target.kind == "python":
+        process = run_process(
+            [sys.executable, target.path.name] + target.args, target.cwd
+        )
+    else:
+        with tempfile.TemporaryDirectory() as build_dir:
+            binary = Path(build_dir) / target.path.stem
+            build = run_process(
+                ["mojo", "build", target.path.name, "-o", str(binary)],
+                target.cwd,
+            )
+            if build.returncode != 0:
+                return Result(
+                    target,
+                    build.returncode,
+                    build.stdout,
+                    build.stderr,
+                    build.seconds,
+                    build.seconds,
+                    build.peak_rss_bytes,
+                )
+            run = run_process([str(binary)] + target.args, target.cwd)
+        return Result(
+            target,
+            run.returncode,
+            build.stdout + run.stdout,
+            build.stderr + run.stderr,
+            build.seconds + run.seconds,
+            build.seconds,
+            max(build.peak_rss_bytes or 0, run.peak_rss_bytes or 0) or None,
+        )
+    return Result(
+        target,
+        process.returncode,
+        process.stdout,
+        process.stderr,
+        process.seconds,
+        peak_rss_bytes=process.peak_rss_bytes,
+    )
+
+
+def print_result(result: Result) -> None:
+    print(f"=== Running {result.target.name} ===")
+    for output in (result.stdout, result.stderr):
+        sys.stdout.write(output)
+        if output and not output.endswith("\n"):
+            sys.stdout.write("\n")
+    status = "Passed" if result.passed else "Failed"
+    print(f"{status}: {result.target.name} ({result.seconds:.1f}s)")
+    sys.stdout.flush()
+
+
+def run_all(targets: list[Target], jobs: int) -> list[Result]:
+    """Run `targets` at most `jobs` at a time, printing each as it finishes."""
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_target, target) for target in targets]
+        for future in as_completed(futures):
+            result = future.result()
+            print_result(result)
+            results.append(result)
+    return results
+
+
+def _report_entry(target: Target, result: Optional[Result]) -> dict:
+    entry = {
+        "name": target.name,
+        "kind": target.kind,
+        "path": target.path.relative_to(SOLUTIONS).as_posix(),
+        "flag": target.flag,
+        "status": "skipped",
+    }
+    if result is not None:
+        entry.update(
+            status="passed" if result.passed else "failed",
+            returncode=result.returncode,
+            seconds=round(result.seconds, 3),
+            compile_seconds=(
+                None
+                if result.compile_seconds is None
+                else round(result.compile_seconds, 3)
+            ),
+            peak_rss_bytes=result.peak_rss_bytes,
+            stdout=result.stdout,
+            stderr=result.stderr,
+        )
+    return entry
+
+
+def write_reports(
+    report_dir: Path,
+    targets: list[Target],
+    results: list[Result],
+    started: datetime,
+    seconds: float,
+) -> None:
+    """Write `results.json` and `junit.xml` for `targets` to `report_dir`.
+
+    Targets without a result were skipped as unchanged.
+    """
+    report_dir.mkdir(parents=True, exist_ok=True)
+    by_target = {result.target: result for result in results}
+    entries = [
+        _report_entry(target, by_target.get(target)) for target in targets
+    ]
+    report = {
+        "started": started.isoformat(),
+        "seconds": round(seconds, 3),
+        "toolchain": toolchain_version(),
+        "targets": entries,
+    }
+    json_report = json.dumps(report, indent=2) + "\n"
+    (report_dir / "results.json").write_text(json_report)
+
+    suite = ET.Element(
+        "testsuite",
+        name="solutions",
+        tests=str(len(entries)),
+        failures=str(sum(entry["status"] == "failed" for entry in entries)),
+        skipped=str(sum(entry["status"] == "skipped" for entry in entries)),
+        time=f"{seconds:.3f}",
+        timestamp=started.isoformat(timespec="seconds"),
+    )
+    for target, entry in zip(targets, entries):
+        case = ET.SubElement(
+            suite,
+            "testcase",
+            classname=target.cwd.relative_to(SOLUTIONS).as_posix(),
+            name=entry["name"],
+            time=f"{entry.get('seconds', 0):.3f}",
+        )
+        if entry["status"] == "skipped":
+            ET.SubElement(case, "skipped", message="unchanged since it passed")
+            continue
+        properties = ET.SubElement(case, "properties")
+        for key in ("compile_seconds", "peak_rss_bytes"):
+            if entry[key] is not None:
+                ET.SubElement(
+                    properties, "property", name=key, value=str(entry[key])
+                )
+        if entry["status"] == "failed":
+            ET.SubElement(
+                case, "failure", message=f"exit code {entry['returncode']}"
+            )
+        ET.SubElement(case, "system-out").text = entry["stdout"]
+        ET.SubElement(case, "system-err").text = entry["stderr"]
+    tree = ET.ElementTree(ET.Element("testsuites"))
+    tree.getroot().append(suite)
+    ET.indent(tree)
+    tree.write(report_dir / "junit.xml", encoding="utf-8", xml_declaration=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "puzzles",
+        nargs="*",
+        help="puzzle directories to run, e.g. p15 (default: all)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="run targets even if unchanged since they last passed",
+    )
+    parser.add_argument(
+        "--report-dir",
+        type=Path,
+        default=REPORT_DIR,
+        help="where to write results.json and junit.xml "
+        "(default: solutions/test-reports)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of targets run at once (default: CPU count)",
+    )
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error(f"--jobs must be at least 1, got {args.jobs}")
+
+    targets = discover(args.puzzles)
+    if not targets:
+        print("No targets found")
+        return 1
+
+    passed_hashes = load_results()
+    hashes = {target: target_hash(target) for target in targets}
+    to_run = targets
+    if not args.force:
+        unchanged = [
+            target
+            for target in targets
+            if passed_hashes.get(target.name) == hashes[target]
+        ]
+        for target in unchanged:
+            print(f"Skipped (unchanged since it passed): {target.name}")
+        to_run = [target for target in targets if target not in unchanged]
+
+    print(f"Running {len(to_run)} targets with {args.jobs} jobs")
+    started = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    results = run_all(to_run, args.jobs)
+    seconds = time.perf_counter() - start
+    write_reports(args.report_dir, targets, results, started, seconds)
+
+    for result in results:
+        if result.passed:
+            passed_hashes[result.target.name] = hashes[result.target]
+        else:
+            passed_hashes.pop(result.target.name, None)
+    save_results(passed_hashes)
+
+    failed = sorted(
+        (result for result in results if not result.passed),
+        key=lambda result: result.target.name,
+    )
+    skipped = len(hashes) - len(results)
+    print(
+        f"\n{len(results) - len(failed)} passed, {len(failed)} failed, "
+        f"{skipped} skipped in {seconds:.1f}s"
+    )
+    for result in failed:
+        print(f"Failed: {result.target.name} (exit code {result.returncode})")
+    print(f"Reports written to {args.report_dir}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())